@@ -44,23 +44,35 @@ class HIDDiagnostic:
         """Scan for Huion devices."""
         print("=== Scanning for Huion devices ===")
 
-        devices = await BleakScanner.discover(timeout=10.0)
-        huion_devices = []
+        huion_devices = {}
+        other_devices = {}
 
-        for device in devices:
-            if device.name and "huion" in device.name.lower():
-                huion_devices.append(device)
-                print(f"Found: {device.name} ({device.address})")
-                if device.metadata:
-                    print(f"  Metadata: {device.metadata}")
+        def on_detection(device, advertisement_data):
+            # Filter as advertisements arrive instead of post-filtering a full discover()
+            name = device.name or advertisement_data.local_name
+            if not name:
+                return
+            if "huion" not in name.lower():
+                other_devices[device.address] = name
+                return
+            if device.address in huion_devices:
+                return
+            huion_devices[device.address] = device
+            print(f"Found: {name} ({device.address})")
+            if advertisement_data.service_uuids:
+                print(f"  Service UUIDs: {advertisement_data.service_uuids}")
+            if advertisement_data.manufacturer_data:
+                print(f"  Manufacturer data: {advertisement_data.manufacturer_data}")
+
+        async with BleakScanner(detection_callback=on_detection):
+            await asyncio.sleep(10.0)
 
         if not huion_devices:
             print("No Huion devices found. Scanning all devices...")
-            for device in devices:
-                if device.name:
-                    print(f"Device: {device.name} ({device.address})")
+            for address, name in other_devices.items():
+                print(f"Device: {name} ({address})")
 
-        return huion_devices
+        return list(huion_devices.values())
 
     async def connect_to_device(self, address: str):
         """Connect to a specific device."""
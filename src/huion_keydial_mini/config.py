@@ -5,6 +5,11 @@ import yaml
 from typing import Optional, Dict, Any, Union, cast
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader, SafeDumper
+
 
 class Config:
     """Configuration class for the driver."""
@@ -162,7 +167,7 @@ class Config:
         if config_file and config_file.exists():
             try:
                 with open(config_file, 'r') as f:
-                    loaded_data = yaml.safe_load(f)
+                    loaded_data = yaml.load(f, Loader=SafeLoader)
                     if isinstance(loaded_data, dict):
                         raw_data = loaded_data  # type: ignore
             except (yaml.YAMLError, IOError) as e:
@@ -239,7 +244,7 @@ class Config:
         config_file.parent.mkdir(parents=True, exist_ok=True)
 
         with open(config_file, 'w') as f:
-            yaml.dump(self.data, f, default_flow_style=False)
+            yaml.dump(self.data, f, Dumper=SafeDumper, default_flow_style=False)
 
     def validate(self) -> bool:
         """Validate the current configuration."""
@@ -68,6 +68,9 @@ class HuionKeydialMini:
         logger.info("Starting Huion Keydial Mini driver...")
 
         try:
+            # Open the virtual input device
+            await self.uinput_handler.start()
+
             # Start the keybind manager socket server
             await self.keybind_manager.start_socket_server()
 
@@ -107,7 +110,7 @@ class HuionKeydialMini:
                 logger.warning(f"Error disconnecting: {e}")
 
         if self.uinput_handler:
-            pass
+            await self.uinput_handler.stop()
 
         if self.keybind_manager:
             await self.keybind_manager.stop_socket_server()
@@ -294,9 +297,10 @@ class HuionKeydialMini:
 
                 # Send events to uinput
                 if self.uinput_handler and events:
-                    for event in events:
-                        await self.uinput_handler.send_event(event)
-                        if self.debug_mode:
+                    # One write for everything in this report
+                    self.uinput_handler.send_events(events)
+                    if self.debug_mode:
+                        for event in events:
                             logger.debug(f"Sent uinput event: {event.event_type} - {event.key_code}")
 
         except Exception as e:
@@ -28,6 +28,11 @@ class InputEvent(NamedTuple):
     value: Optional[int] = None
     raw_data: Optional[bytearray] = None  # Store raw data for debugging
 
+    @property
+    def is_press(self) -> bool:
+        """Whether this is a key press (as opposed to a release)."""
+        return self.event_type is EventType.KEY_PRESS
+
 
 class HIDParser:
     """Parser for HID data from the Huion Keydial Mini."""
@@ -47,7 +52,7 @@ class HIDParser:
         self.active_sticky_actions = {}  # Track action_id -> buttons for active sticky actions
         self.keybind_manager = None  # Will be set by the main application
 
-    def parse(self, data: bytearray, characteristic_uuid: Optional[str] = None) -> List[InputEvent]:
+    def parse(self, data: bytes, characteristic_uuid: Optional[str] = None) -> List[InputEvent]:
         """Parse HID data and return input events."""
         events = []
 
@@ -103,7 +108,7 @@ class HIDParser:
             return parts[0][-2:]  # Last 2 characters
         return ""
 
-    def _parse_button_events(self, data: bytearray) -> List[InputEvent]:
+    def _parse_button_events(self, data: bytes) -> List[InputEvent]:
         """Parse button events with unified individual/combo detection and sticky functionality."""
         events = []
 
@@ -243,7 +248,7 @@ class HIDParser:
         # This is because keydialctl mappings are stored in KeybindManager, not config.key_mappings
         return True
 
-    def _get_button_names_from_data(self, data: bytearray) -> List[str]:
+    def _get_button_names_from_data(self, data: bytes) -> List[str]:
         """ Get button names from data """
         button_names = []
         # There are 2 types of button signals going on
@@ -289,7 +294,7 @@ class HIDParser:
 
         return button_names
 
-    def _parse_dial_events(self, data: bytearray) -> List[InputEvent]:
+    def _parse_dial_events(self, data: bytes) -> List[InputEvent]:
         """Parse dial events from Handle 0x0034 format."""
         events = []
 
@@ -364,8 +369,12 @@ class HIDParser:
         return events
 
     def reset_state(self):
-        """Reset the parser state."""
+        """Reset the parser state, including any combo session in progress."""
         self.previous_state = {}
+        self.peak_buttons_this_session = set()
+        self.key_event_triggered = False
+        self.active_sticky_buttons = set()
+        self.active_sticky_actions = {}
         logger.debug("Parser state reset")
 
     def get_debug_info(self) -> Dict[str, Any]:
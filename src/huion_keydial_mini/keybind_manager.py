@@ -7,15 +7,66 @@ import logging
 import socket
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 
 from .config import Config
 
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used otherwise
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+# Action IDs accepted in config files and over the control socket
+_VALID_BUTTONS = frozenset(f'BUTTON_{i}' for i in range(1, 19))
+_VALID_DIAL_ACTIONS = frozenset({'DIAL_CW', 'DIAL_CCW', 'DIAL_CLICK'})
+
+# Longest control socket message (one JSON line) either side will read.
+# asyncio's default of 64 KiB is too small for large set_bindings batches.
+_MAX_MESSAGE_SIZE = 1024 * 1024
+
+# Bytes read from a control socket client at a time
+_READ_CHUNK_SIZE = 64 * 1024
+
+# How long send_commands waits for each response. Daemons from before
+# multi-command connections answer only the first command and keep the
+# connection open, so without a timeout the client would wait forever.
+_RESPONSE_TIMEOUT = 5.0
+
+# Highest evdev key code (KEY_MAX in linux/input-event-codes.h), kept here
+# so this module doesn't need evdev
+KEY_CODE_MAX = 0x2ff
+
+
+def is_valid_key_code(key: Any) -> bool:
+    """Whether a binding key is a raw key code uinput can send.
+
+    bool subclasses int but is rejected, so True isn't sent as key code 1.
+    """
+    return isinstance(key, int) and not isinstance(key, bool) and 0 < key <= KEY_CODE_MAX
+
+
+def _encode_message(message: Dict[str, Any]) -> bytes:
+    """Encode a control socket message as a newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(message) + b'\n'
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def _decode_message(data: bytes) -> Any:
+    """Decode a control socket JSON line.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    need to catch the latter.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
 
 class EventType(Enum):
     """Types of events that can be bound."""
@@ -26,9 +77,18 @@ class EventType(Enum):
 class KeybindAction:
     """Represents a keybind action."""
     type: EventType
-    keys: Optional[List[str]] = None
+    # Key names from KEY_MAPPING, or raw evdev key codes
+    keys: Optional[List[Union[str, int]]] = None
     description: Optional[str] = None
     sticky: bool = False
+    # Key codes resolved from `keys` by the uinput handler, cached on first use
+    _resolved_keys: Optional[Tuple[int, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Packed uinput (press, release) frames built from `_resolved_keys`
+    _frames: Optional[Tuple[bytes, bytes]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -41,10 +101,21 @@ class KeybindAction:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'KeybindAction':
-        """Create from dictionary."""
+        """Create from dictionary.
+
+        Raises ValueError if a key is neither a key name nor a valid raw key code.
+        """
+        keys = data.get('keys')
+        if keys is not None:
+            if not isinstance(keys, list):
+                raise ValueError(f"keys must be a list, got {keys!r}")
+            for key in keys:
+                if not isinstance(key, str) and not is_valid_key_code(key):
+                    raise ValueError(f"Invalid key: {key!r}")
+
         return cls(
             type=EventType(data['type']),
-            keys=data.get('keys'),
+            keys=keys,
             description=data.get('description'),
             sticky=data.get('sticky', False)
         )
@@ -119,20 +190,11 @@ class KeybindManager:
 
     def _validate_and_normalize_action_id(self, action_id: str) -> Optional[str]:
         """Validate and normalize an action ID from config file."""
-        valid_buttons = [
-            'BUTTON_1', 'BUTTON_2', 'BUTTON_3', 'BUTTON_4',
-            'BUTTON_5', 'BUTTON_6', 'BUTTON_7', 'BUTTON_8',
-            'BUTTON_9', 'BUTTON_10', 'BUTTON_11', 'BUTTON_12',
-            'BUTTON_13', 'BUTTON_14', 'BUTTON_15', 'BUTTON_16',
-            'BUTTON_17', 'BUTTON_18'
-        ]
-        valid_dial_actions = ['DIAL_CW', 'DIAL_CCW', 'DIAL_CLICK']
-
         # Check if it's a valid action_id
-        if action_id in valid_dial_actions:
+        if action_id in _VALID_DIAL_ACTIONS:
             # Valid dial action
             return action_id
-        elif action_id in valid_buttons:
+        elif action_id in _VALID_BUTTONS:
             # Valid individual button
             return action_id
         elif '+' in action_id:
@@ -149,7 +211,7 @@ class KeybindManager:
                 return None
 
             for button in combo_buttons:
-                if button not in valid_buttons:
+                if button not in _VALID_BUTTONS:
                     logger.warning(f"Config: Invalid button name '{button}' in combination '{action_id}', ignoring")
                     return None
 
@@ -193,30 +255,79 @@ class KeybindManager:
             logger.info("Stopped control socket server")
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        """Handle client connection to the control socket."""
+        """Handle client connection to the control socket.
+
+        Commands are newline-delimited JSON and answered in order, one
+        response line per command. A client may send several commands over
+        one connection and closes it when done.
+
+        Older clients send a single command with no trailing newline and keep
+        the connection open until they get the reply. Buffered data without a
+        newline is therefore answered as soon as it parses as a complete JSON
+        object.
+        """
+        buffer = b''
         try:
-            # Read command
-            data = await reader.read(1024)
-            if not data:
-                return
-
-            command = json.loads(data.decode('utf-8'))
-            response = await self._process_command(command)
-
-            # Send response with newline delimiter
-            writer.write((json.dumps(response) + '\n').encode('utf-8'))
-            await writer.drain()
+            while True:
+                chunk = await reader.read(_READ_CHUNK_SIZE)
+                if not chunk:
+                    # Client closed; answer a final command left without a newline
+                    if buffer.strip():
+                        await self._respond(writer, buffer)
+                    break
+
+                buffer += chunk
+                *lines, buffer = buffer.split(b'\n')
+                if len(buffer) > _MAX_MESSAGE_SIZE or any(len(line) > _MAX_MESSAGE_SIZE for line in lines):
+                    # Checked before answering anything, so an oversized
+                    # command never gets processed. Its remainder can't be
+                    # told apart from the next command, so end the connection.
+                    response = {
+                        'status': 'error',
+                        'message': f'Command too long (limit is {_MAX_MESSAGE_SIZE} bytes)'
+                    }
+                    writer.write(_encode_message(response))
+                    await writer.drain()
+                    break
+
+                for line in lines:
+                    if line.strip():
+                        await self._respond(writer, line)
+
+                if buffer.rstrip().endswith(b'}'):
+                    # Possibly a whole newline-less command from an older client
+                    try:
+                        command = _decode_message(buffer)
+                    except ValueError:
+                        pass  # Incomplete, wait for more data
+                    else:
+                        buffer = b''
+                        await self._respond(writer, command=command)
 
-        except json.JSONDecodeError:
-            error_response = {'status': 'error', 'message': 'Invalid JSON'}
-            writer.write((json.dumps(error_response) + '\n').encode('utf-8'))
-            await writer.drain()
         except Exception as e:
             logger.error(f"Error handling client command: {e}")
-            error_response = {'status': 'error', 'message': str(e)}
-            writer.write((json.dumps(error_response) + '\n').encode('utf-8'))
-            await writer.drain()
-        # Don't close the connection here - let the client close it
+            try:
+                error_response = {'status': 'error', 'message': str(e)}
+                writer.write(_encode_message(error_response))
+                await writer.drain()
+            except Exception:
+                pass  # Client already gone
+
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, data: bytes = b'', command: Any = None):
+        """Process one command, given raw or already decoded, and write its response line."""
+        try:
+            if command is None:
+                command = _decode_message(data)
+            response = await self._process_command(command)
+        except json.JSONDecodeError:
+            response = {'status': 'error', 'message': 'Invalid JSON'}
+
+        # Send response with newline delimiter
+        writer.write(_encode_message(response))
+        await writer.drain()
 
     async def _process_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Process a control command."""
@@ -227,6 +338,8 @@ class KeybindManager:
                 return await self._cmd_get_bindings()
             elif cmd_type == 'set_binding':
                 return await self._cmd_set_binding(command)
+            elif cmd_type == 'set_bindings':
+                return await self._cmd_set_bindings(command)
             elif cmd_type == 'remove_binding':
                 return await self._cmd_remove_binding(command)
             elif cmd_type == 'clear_all':
@@ -270,6 +383,46 @@ class KeybindManager:
         except Exception as e:
             return {'status': 'error', 'message': f'Invalid action data: {e}'}
 
+    async def _cmd_set_bindings(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Set several keybindings at once (all or nothing)."""
+        items = command.get('items')
+
+        if not isinstance(items, list) or not items:
+            return {'status': 'error', 'message': 'Missing items'}
+
+        # Validate every item before touching the map, so a bad one rejects the batch
+        actions: Dict[str, KeybindAction] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                return {'status': 'error', 'message': f'Invalid item: {item!r}'}
+
+            action_id = item.get('action_id')
+            action_data = item.get('action')
+
+            if not action_id or not action_data:
+                return {'status': 'error', 'message': 'Missing action_id or action'}
+
+            # Store combos in the sorted order the parser looks them up by
+            normalized_id = (
+                self._validate_and_normalize_action_id(action_id) if isinstance(action_id, str) else None
+            )
+            if normalized_id is None:
+                return {'status': 'error', 'message': f'Invalid action_id: {action_id}'}
+            action_id = normalized_id
+
+            try:
+                actions[action_id] = KeybindAction.from_dict(action_data)
+            except Exception as e:
+                return {'status': 'error', 'message': f'Invalid action data for {action_id}: {e}'}
+
+        self.keybind_map.update(actions)
+
+        logger.info(f"Set {len(actions)} bindings")
+        return {
+            'status': 'success',
+            'message': f'{len(actions)} bindings updated'
+        }
+
     async def _cmd_remove_binding(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Remove a keybinding."""
         action_id = command.get('action_id')
@@ -336,7 +489,7 @@ class KeybindManager:
         """Check if an action ID represents a combo (contains '+')."""
         return '+' in action_id
 
-    def set_combo_action(self, buttons: List[str], keys: List[str], description: Optional[str] = None):
+    def set_combo_action(self, buttons: List[str], keys: List[Union[str, int]], description: Optional[str] = None):
         """Set a combo action from a list of buttons and target keys."""
         # Generate combo ID by sorting button names
         sorted_buttons = sorted(buttons)
@@ -345,7 +498,7 @@ class KeybindManager:
         action = KeybindAction(
             type=EventType.KEYBOARD,
             keys=keys,
-            description=description or f"Combo {combo_id} -> {'+'.join(keys)}"
+            description=description or f"Combo {combo_id} -> {'+'.join(map(str, keys))}"
         )
 
         self.set_action(combo_id, action)
@@ -368,33 +521,71 @@ class KeybindManager:
         }
 
 
+class NullKeybindManager:
+    """Stand-in for a missing KeybindManager: no actions are bound.
+
+    Lets callers use a manager unconditionally instead of checking for None.
+    """
+
+    def get_action(self, action_id: str) -> Optional[KeybindAction]:
+        """Get a keybind action by ID (never bound)."""
+        return None
+
+    def get_all_actions(self) -> Dict[str, KeybindAction]:
+        """Get all current keybind actions (none)."""
+        return {}
+
+
 # Client-side functions for keydialctl
 async def send_command(socket_path: str, command: Dict[str, Any]) -> Dict[str, Any]:
     """Send a command to the keybind manager via Unix socket."""
+    responses = await send_commands(socket_path, [command])
+    return responses[0]
+
+
+async def send_commands(socket_path: str, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Send several commands to the keybind manager over one Unix socket connection.
+
+    Returns one response per command, in order. If communication fails, every
+    command left without a response gets the error response. Each response is
+    waited for at most _RESPONSE_TIMEOUT seconds, so a daemon that answers
+    only the first command of a connection can't hang the client.
+    """
+    responses: List[Dict[str, Any]] = []
+    error: Optional[Dict[str, Any]] = None
+
     try:
-        reader, writer = await asyncio.open_unix_connection(socket_path)
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=_MAX_MESSAGE_SIZE)
 
-        # Send command
-        writer.write(json.dumps(command).encode('utf-8'))
+        # Send all commands, then read the responses (newline delimited)
+        for command in commands:
+            writer.write(_encode_message(command))
         await writer.drain()
 
-        # Read response (until newline delimiter)
-        data = await reader.readline()
-        if not data:
-            return {'status': 'error', 'message': 'No response from service'}
-
-        response = json.loads(data.decode('utf-8'))
+        for _ in commands:
+            try:
+                data = await asyncio.wait_for(reader.readline(), _RESPONSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                error = {'status': 'error', 'message': 'Timed out waiting for a response from service'}
+                break
+            if not data:
+                error = {'status': 'error', 'message': 'No response from service'}
+                break
+            responses.append(_decode_message(data))
 
         writer.close()
         await writer.wait_closed()
 
-        return response
-
     except FileNotFoundError:
-        return {'status': 'error', 'message': 'Service not running (socket not found)'}
+        error = {'status': 'error', 'message': 'Service not running (socket not found)'}
     except ConnectionRefusedError:
-        return {'status': 'error', 'message': 'Service not running (connection refused)'}
+        error = {'status': 'error', 'message': 'Service not running (connection refused)'}
     except json.JSONDecodeError as e:
-        return {'status': 'error', 'message': f'Invalid response from service: {e}'}
+        error = {'status': 'error', 'message': f'Invalid response from service: {e}'}
     except Exception as e:
-        return {'status': 'error', 'message': f'Communication error: {e}'}
+        error = {'status': 'error', 'message': f'Communication error: {e}'}
+
+    if error is not None:
+        responses.extend(dict(error) for _ in range(len(commands) - len(responses)))
+
+    return responses
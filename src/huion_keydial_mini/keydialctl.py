@@ -2,20 +2,48 @@
 
 import asyncio
 import logging
+import re
 import sys
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import click
-import yaml
 
 from .config import Config
-from .uinput_handler import UInputHandler
-from .keybind_manager import send_command, KeybindAction, EventType
 
 
 logger = logging.getLogger(__name__)
 
+# Bluetooth MAC address, e.g. AA:BB:CC:DD:EE:FF
+_MAC_RE = re.compile(r'^[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}$')
+
+# Valid action IDs for bind/unbind
+_VALID_BUTTONS = (
+    'BUTTON_1', 'BUTTON_2', 'BUTTON_3', 'BUTTON_4',
+    'BUTTON_5', 'BUTTON_6', 'BUTTON_7', 'BUTTON_8',
+    'BUTTON_9', 'BUTTON_10', 'BUTTON_11', 'BUTTON_12',
+    'BUTTON_13', 'BUTTON_14', 'BUTTON_15', 'BUTTON_16',
+    'BUTTON_17', 'BUTTON_18'
+)
+_VALID_DIAL_ACTIONS = ('DIAL_CW', 'DIAL_CCW', 'DIAL_CLICK')
+# Sets for membership tests; the tuples above keep display order
+_BUTTON_SET = frozenset(_VALID_BUTTONS)
+_ACTION_ID_SET = _BUTTON_SET | frozenset(_VALID_DIAL_ACTIONS)
+
+# Key groups used by `list_keys`
+_MODIFIER_KEYS = frozenset({
+    'KEY_LEFTCTRL', 'KEY_RIGHTCTRL', 'KEY_LEFTSHIFT', 'KEY_RIGHTSHIFT',
+    'KEY_LEFTALT', 'KEY_RIGHTALT', 'KEY_LEFTMETA', 'KEY_RIGHTMETA',
+})
+_NAVIGATION_KEYS = frozenset({
+    'KEY_UP', 'KEY_DOWN', 'KEY_LEFT', 'KEY_RIGHT',
+    'KEY_HOME', 'KEY_END', 'KEY_PAGEUP', 'KEY_PAGEDOWN',
+})
+_MEDIA_KEYS = frozenset({
+    'KEY_VOLUMEUP', 'KEY_VOLUMEDOWN', 'KEY_MUTE',
+    'KEY_PLAYPAUSE', 'KEY_NEXTSONG', 'KEY_PREVIOUSSONG',
+})
+
 
 def get_socket_path() -> str:
     """Get the default socket path for the user-level service."""
@@ -56,65 +84,17 @@ def bind(ctx, action_id: str, key_data: str, sticky: bool):
 
     Note: You can also configure actions in the config file using the new format.
     """
-    async def do_bind():
-        socket_path = get_socket_path()
-
-        # Validate action_id format
-        valid_buttons = [
-            'BUTTON_1', 'BUTTON_2', 'BUTTON_3', 'BUTTON_4',
-            'BUTTON_5', 'BUTTON_6', 'BUTTON_7', 'BUTTON_8',
-            'BUTTON_9', 'BUTTON_10', 'BUTTON_11', 'BUTTON_12',
-            'BUTTON_13', 'BUTTON_14', 'BUTTON_15', 'BUTTON_16',
-            'BUTTON_17', 'BUTTON_18'
-        ]
-        valid_dial_actions = ['DIAL_CW', 'DIAL_CCW', 'DIAL_CLICK']
-
-        # Validate and normalize action_id
-        normalized_action_id = action_id  # Start with original
-
-        if action_id in valid_dial_actions:
-            # Valid dial action
-            pass
-        elif action_id in valid_buttons:
-            # Valid individual button
-            pass
-        elif '+' in action_id:
-            # Check if it's a valid combo
-            combo_buttons = [b.strip() for b in action_id.split('+')]
-
-            if len(combo_buttons) < 2:
-                click.echo("Error: Button combinations must include at least 2 buttons", err=True)
-                sys.exit(1)
-
-            for button in combo_buttons:
-                if button not in valid_buttons:
-                    click.echo(f"Error: Invalid button name '{button}' in combination", err=True)
-                    click.echo(f"Valid buttons: {', '.join(valid_buttons)}")
-                    sys.exit(1)
+    normalized_action_id = _normalize_action_id(action_id)
 
-            # Normalize combo format (sorted for consistency)
-            sorted_buttons = sorted(combo_buttons)
-            normalized_action_id = "+".join(sorted_buttons)
-        else:
-            click.echo(f"Error: Invalid action ID '{action_id}'", err=True)
-            click.echo(f"Valid individual buttons: {', '.join(valid_buttons)}")
-            click.echo(f"Valid dial actions: {', '.join(valid_dial_actions)}")
-            click.echo(f"Button combinations: BUTTON_1+BUTTON_2, etc.")
-            sys.exit(1)
+    async def do_bind():
+        from .keybind_manager import send_command
 
-        # Parse key data
-        keys = [k.strip() for k in key_data.split('+')]
-        action = {
-            'type': 'keyboard',
-            'keys': keys,
-            'sticky': sticky,
-            'description': f"{normalized_action_id} -> {key_data}" + (" (sticky)" if sticky else "")
-        }
+        socket_path = get_socket_path()
 
         command = {
             'command': 'set_binding',
             'action_id': normalized_action_id,
-            'action': action
+            'action': _keyboard_action(normalized_action_id, key_data, sticky)
         }
 
         response = await send_command(socket_path, command)
@@ -128,7 +108,67 @@ def bind(ctx, action_id: str, key_data: str, sticky: bool):
     asyncio.run(do_bind())
 
 
+@cli.command()
+@click.argument('bindings_file', type=click.File('r'))
+@click.option('--sticky', is_flag=True, default=False, help='Make all bindings in the file sticky')
+@click.option('--replace', is_flag=True, default=False, help='Clear all runtime bindings before applying the file')
+@click.pass_context
+def bind_many(ctx, bindings_file, sticky: bool, replace: bool):
+    """Bind several actions at once from a file.
+
+    BINDINGS_FILE: File with one ACTION_ID,KEY_DATA pair per line ('-' reads
+    from stdin). Blank lines and lines starting with '#' are ignored.
+
+    All bindings are sent to the service in a single request. With --replace,
+    existing runtime bindings are cleared first over the same connection.
 
+    Example file:
+      BUTTON_1,KEY_F1
+      BUTTON_1+BUTTON_2,KEY_LEFTCTRL+KEY_C
+      DIAL_CW,KEY_VOLUMEUP
+    """
+    items = []
+    for line_number, line in enumerate(bindings_file, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        action_id, separator, key_data = line.partition(',')
+        key_data = key_data.strip()
+        if not separator or not key_data:
+            click.echo(f"Error: Line {line_number}: expected ACTION_ID,KEY_DATA", err=True)
+            sys.exit(1)
+
+        normalized_action_id = _normalize_action_id(action_id.strip())
+        items.append({
+            'action_id': normalized_action_id,
+            'action': _keyboard_action(normalized_action_id, key_data, sticky)
+        })
+
+    if not items:
+        click.echo("No bindings found in file")
+        return
+
+    async def do_bind_many():
+        from .keybind_manager import send_commands
+
+        socket_path = get_socket_path()
+
+        commands = [{
+            'command': 'set_bindings',
+            'items': items
+        }]
+        if replace:
+            commands.insert(0, {'command': 'clear_all'})
+
+        for response in await send_commands(socket_path, commands):
+            if response['status'] != 'success':
+                click.echo(f"Error: {response['message']}", err=True)
+                sys.exit(1)
+
+        click.echo(f"Bound {len(items)} actions")
+
+    asyncio.run(do_bind_many())
 
 
 @cli.command()
@@ -145,51 +185,12 @@ def unbind(ctx, action_id: str):
       keydialctl unbind BUTTON_1+BUTTON_2          # Remove button combination binding
       keydialctl unbind DIAL_CW                     # Remove dial action binding
     """
-    async def do_unbind():
-        socket_path = get_socket_path()
+    normalized_action_id = _normalize_action_id(action_id)
 
-        # Validate and normalize action_id format (same logic as bind)
-        valid_buttons = [
-            'BUTTON_1', 'BUTTON_2', 'BUTTON_3', 'BUTTON_4',
-            'BUTTON_5', 'BUTTON_6', 'BUTTON_7', 'BUTTON_8',
-            'BUTTON_9', 'BUTTON_10', 'BUTTON_11', 'BUTTON_12',
-            'BUTTON_13', 'BUTTON_14', 'BUTTON_15', 'BUTTON_16',
-            'BUTTON_17', 'BUTTON_18'
-        ]
-        valid_dial_actions = ['DIAL_CW', 'DIAL_CCW', 'DIAL_CLICK']
-
-        # Validate and normalize action_id
-        normalized_action_id = action_id  # Start with original
-
-        if action_id in valid_dial_actions:
-            # Valid dial action
-            pass
-        elif action_id in valid_buttons:
-            # Valid individual button
-            pass
-        elif '+' in action_id:
-            # Check if it's a valid combo
-            combo_buttons = [b.strip() for b in action_id.split('+')]
-
-            if len(combo_buttons) < 2:
-                click.echo("Error: Button combinations must include at least 2 buttons", err=True)
-                sys.exit(1)
-
-            for button in combo_buttons:
-                if button not in valid_buttons:
-                    click.echo(f"Error: Invalid button name '{button}' in combination", err=True)
-                    click.echo(f"Valid buttons: {', '.join(valid_buttons)}")
-                    sys.exit(1)
+    async def do_unbind():
+        from .keybind_manager import send_command
 
-            # Normalize combo format (sorted for consistency)
-            sorted_buttons = sorted(combo_buttons)
-            normalized_action_id = "+".join(sorted_buttons)
-        else:
-            click.echo(f"Error: Invalid action ID '{action_id}'", err=True)
-            click.echo(f"Valid individual buttons: {', '.join(valid_buttons)}")
-            click.echo(f"Valid dial actions: {', '.join(valid_dial_actions)}")
-            click.echo(f"Button combinations: BUTTON_1+BUTTON_2, etc.")
-            sys.exit(1)
+        socket_path = get_socket_path()
 
         command = {
             'command': 'remove_binding',
@@ -212,6 +213,8 @@ def unbind(ctx, action_id: str):
 def list_bindings(ctx):
     """List current key bindings."""
     async def do_list():
+        from .keybind_manager import send_command
+
         socket_path = get_socket_path()
 
         command = {
@@ -251,7 +254,7 @@ def list_bindings(ctx):
                     sticky_text = " (sticky)" if action_data.get('sticky', False) else ""
 
                     if action_type == 'keyboard':
-                        keys = '+'.join(action_data['keys']) if action_data['keys'] else 'none'
+                        keys = '+'.join(map(str, action_data['keys'])) if action_data['keys'] else 'none'
                         click.echo(f"  {action_id}: {keys}{sticky_text}")
                     else:
                         description = action_data.get('description', 'No description')
@@ -266,7 +269,7 @@ def list_bindings(ctx):
                     sticky_text = " (sticky)" if action_data.get('sticky', False) else ""
 
                     if action_type == 'keyboard':
-                        keys = '+'.join(action_data['keys']) if action_data['keys'] else 'none'
+                        keys = '+'.join(map(str, action_data['keys'])) if action_data['keys'] else 'none'
                         click.echo(f"  {action_id}: {keys}{sticky_text}")
                     else:
                         description = action_data.get('description', 'No description')
@@ -281,7 +284,7 @@ def list_bindings(ctx):
                     sticky_text = " (sticky)" if action_data.get('sticky', False) else ""
 
                     if action_type == 'keyboard':
-                        keys = '+'.join(action_data['keys']) if action_data['keys'] else 'none'
+                        keys = '+'.join(map(str, action_data['keys'])) if action_data['keys'] else 'none'
                         click.echo(f"  {action_id}: {keys}{sticky_text}")
                     else:
                         description = action_data.get('description', 'No description')
@@ -289,30 +292,26 @@ def list_bindings(ctx):
                 click.echo()
         else:
             # Fallback to config file if service is not running
-            click.echo(f"Service not running: {response['message']}")
-            click.echo("Showing bindings from config file:")
-            click.echo()
-
             config_path = ctx.obj.get('config_path')
             config = _load_config(config_path)
+            key_mappings = config.key_mappings
+            dial_settings = config.dial_settings
+
+            lines = [
+                f"Service not running: {response['message']}",
+                "Showing bindings from config file:",
+                "",
+            ]
 
             # Show button mappings
-            for button in ['BUTTON_1', 'BUTTON_2', 'BUTTON_3', 'BUTTON_4',
-                          'BUTTON_5', 'BUTTON_6', 'BUTTON_7', 'BUTTON_8',
-                          'BUTTON_9', 'BUTTON_10', 'BUTTON_11', 'BUTTON_12',
-                          'BUTTON_13', 'BUTTON_14', 'BUTTON_15', 'BUTTON_16',
-                          'BUTTON_17', 'BUTTON_18']:
-                key = config.key_mappings.get(button, 'unbound')
-                click.echo(f"  {button}: {key}")
+            lines.extend(f"  {button}: {key_mappings.get(button, 'unbound')}" for button in _VALID_BUTTONS)
 
             # Show dial settings
-            dial_settings = config.dial_settings
-            click.echo(f"  DIAL_CW: {dial_settings.get('DIAL_CW', 'unset')}")
-            click.echo(f"  DIAL_CCW: {dial_settings.get('DIAL_CCW', 'unset')}")
-            click.echo(f"  DIAL_CLICK: {dial_settings.get('DIAL_CLICK', 'unset')}")
+            lines.extend(f"  {dial}: {dial_settings.get(dial, 'unset')}" for dial in _VALID_DIAL_ACTIONS)
 
-            click.echo()
-            click.echo("Note: Start the service to use runtime keybind management")
+            lines.append("")
+            lines.append("Note: Start the service to use runtime keybind management")
+            click.echo("\n".join(lines))
 
     asyncio.run(do_list())
 
@@ -321,63 +320,46 @@ def list_bindings(ctx):
 @click.pass_context
 def list_keys(ctx):
     """List supported key codes."""
-    config_path = ctx.obj.get('config_path')
-    config = _load_config(config_path)
-    uinput = UInputHandler(config)
-    supported_keys = uinput.get_supported_keys()
-
-    click.echo("Supported key codes:")
-    click.echo()
-
-    # Group keys by category
-    function_keys = [k for k in supported_keys if k.startswith('KEY_F')]
-    modifier_keys = [k for k in supported_keys if 'CTRL' in k or 'SHIFT' in k or 'ALT' in k or 'META' in k]
-    navigation_keys = [k for k in supported_keys if k in ['KEY_UP', 'KEY_DOWN', 'KEY_LEFT', 'KEY_RIGHT', 'KEY_HOME', 'KEY_END', 'KEY_PAGEUP', 'KEY_PAGEDOWN']]
-    media_keys = [k for k in supported_keys if k in ['KEY_VOLUMEUP', 'KEY_VOLUMEDOWN', 'KEY_MUTE', 'KEY_PLAYPAUSE', 'KEY_NEXTSONG', 'KEY_PREVIOUSSONG']]
-    letter_keys = [k for k in supported_keys if len(k) == 4 and k.startswith('KEY_') and k[4:].isalpha()]
-    number_keys = [k for k in supported_keys if len(k) == 4 and k.startswith('KEY_') and k[4:].isdigit()]
-    other_keys = [k for k in supported_keys if k not in function_keys + modifier_keys + navigation_keys + media_keys + letter_keys + number_keys]
-
-    if function_keys:
-        click.echo("Function keys:")
-        for key in sorted(function_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if modifier_keys:
-        click.echo("Modifier keys:")
-        for key in sorted(modifier_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if navigation_keys:
-        click.echo("Navigation keys:")
-        for key in sorted(navigation_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if media_keys:
-        click.echo("Media keys:")
-        for key in sorted(media_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if letter_keys:
-        click.echo("Letter keys:")
-        for key in sorted(letter_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if number_keys:
-        click.echo("Number keys:")
-        for key in sorted(number_keys):
-            click.echo(f"  {key}")
-        click.echo()
-
-    if other_keys:
-        click.echo("Other keys:")
-        for key in sorted(other_keys):
-            click.echo(f"  {key}")
+    # Imported here so other commands don't pay for loading evdev
+    from .uinput_handler import supported_key_names
+
+    supported_keys = supported_key_names()
+
+    # Group keys by category in a single pass
+    groups: Dict[str, List[str]] = {
+        "Function keys": [],
+        "Modifier keys": [],
+        "Navigation keys": [],
+        "Media keys": [],
+        "Letter keys": [],
+        "Number keys": [],
+        "Other keys": [],
+    }
+    for key in supported_keys:
+        if key.startswith('KEY_F') and key[5:].isdigit():
+            group = "Function keys"
+        elif key in _MODIFIER_KEYS:
+            group = "Modifier keys"
+        elif key in _NAVIGATION_KEYS:
+            group = "Navigation keys"
+        elif key in _MEDIA_KEYS:
+            group = "Media keys"
+        elif len(key) == 5 and key.startswith('KEY_') and key[4].isalpha():
+            group = "Letter keys"
+        elif len(key) == 5 and key.startswith('KEY_') and key[4].isdigit():
+            group = "Number keys"
+        else:
+            group = "Other keys"
+        groups[group].append(key)
+
+    # Build the whole listing and write it once
+    lines = ["Supported key codes:", ""]
+    for title, keys in groups.items():
+        if keys:
+            lines.append(f"{title}:")
+            lines.extend(f"  {key}" for key in sorted(keys))
+            lines.append("")
+    click.echo("\n".join(lines))
 
 
 @cli.command()
@@ -389,10 +371,16 @@ def set_device(ctx, device_address: str):
     config = _load_config(config_path)
 
     # Validate device address format
-    if not device_address or len(device_address) != 17:
+    if not device_address or not _MAC_RE.match(device_address):
         click.echo("Error: Invalid device address format", err=True)
         click.echo("Expected format: XX:XX:XX:XX:XX:XX")
         sys.exit(1)
+    device_address = device_address.upper()
+
+    # Nothing to write if the address is unchanged
+    if config.device_address == device_address:
+        click.echo(f"Device address already set to: {device_address}")
+        return
 
     # Update configuration
     config.data['device_address'] = device_address
@@ -431,6 +419,8 @@ def clear_device(ctx):
 def reset(ctx):
     """Reset runtime bindings (clears all key bindings without modifying config file)."""
     async def do_reset():
+        from .keybind_manager import send_command
+
         socket_path = get_socket_path()
 
         try:
@@ -450,6 +440,45 @@ def reset(ctx):
     asyncio.run(do_reset())
 
 
+def _normalize_action_id(action_id: str) -> str:
+    """Validate an action ID and return its normalized form, exiting on error."""
+    if action_id in _ACTION_ID_SET:
+        return action_id
+
+    if '+' in action_id:
+        # Check if it's a valid combo
+        combo_buttons = [b.strip() for b in action_id.split('+')]
+
+        if len(combo_buttons) < 2:
+            click.echo("Error: Button combinations must include at least 2 buttons", err=True)
+            sys.exit(1)
+
+        for button in combo_buttons:
+            if button not in _BUTTON_SET:
+                click.echo(f"Error: Invalid button name '{button}' in combination", err=True)
+                click.echo(f"Valid buttons: {', '.join(_VALID_BUTTONS)}")
+                sys.exit(1)
+
+        # Normalize combo format (sorted for consistency)
+        return "+".join(sorted(combo_buttons))
+
+    click.echo(f"Error: Invalid action ID '{action_id}'", err=True)
+    click.echo(f"Valid individual buttons: {', '.join(_VALID_BUTTONS)}")
+    click.echo(f"Valid dial actions: {', '.join(_VALID_DIAL_ACTIONS)}")
+    click.echo(f"Button combinations: BUTTON_1+BUTTON_2, etc.")
+    sys.exit(1)
+
+
+def _keyboard_action(action_id: str, key_data: str, sticky: bool) -> Dict[str, Any]:
+    """Build the keyboard action payload sent to the service."""
+    return {
+        'type': 'keyboard',
+        'keys': [k.strip() for k in key_data.split('+')],
+        'sticky': sticky,
+        'description': f"{action_id} -> {key_data}" + (" (sticky)" if sticky else "")
+    }
+
+
 def _load_config(config_path: Optional[str]) -> Config:
     """Load configuration from file."""
     return Config.load(config_path)
@@ -21,12 +21,15 @@ class DriverManager:
     def __init__(self, config: Config):
         self.config = config
         self.device: Optional[HuionKeydialMini] = None
-        self.running = False
+        # Created in start() so it binds to the running loop (Python 3.8)
+        self._stop_event: Optional[asyncio.Event] = None
 
     async def start(self):
         """Start the driver."""
         logger.info("Starting Huion Keydial Mini driver...")
 
+        self._stop_event = asyncio.Event()
+
         try:
             # Initialize the device
             self.device = HuionKeydialMini(self.config)
@@ -38,13 +41,11 @@ class DriverManager:
 
             # Start the device
             await self.device.start()
-            self.running = True
 
             logger.info("Driver started successfully")
 
-            # Keep the driver running
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep the driver running until a shutdown signal arrives
+            await self._stop_event.wait()
 
         except Exception as e:
             logger.error(f"Failed to start driver: {e}")
@@ -55,7 +56,8 @@ class DriverManager:
     def _signal_handler(self):
         """Handle shutdown signals."""
         logger.info("Shutdown signal received")
-        self.running = False
+        if self._stop_event:
+            self._stop_event.set()
 
     async def stop(self):
         """Stop the driver."""
@@ -108,8 +110,6 @@ def main(config: Optional[str], device_address: Optional[str], log_level: str, u
 
 async def run_driver_with_logger(event_logger, show_raw: bool = False, auto_connect: bool = True):
     """Run the driver with a custom event logger."""
-    from .device import HuionKeydialMini
-
     # Set up clean logging
     logging.getLogger('bleak').setLevel(logging.WARNING)
     logging.getLogger('asyncio').setLevel(logging.WARNING)
@@ -134,13 +134,18 @@ async def run_driver_with_logger(event_logger, show_raw: bool = False, auto_conn
         # Start the device (includes connection)
         await device.start()
 
-        # Keep running until interrupted
+        # Keep running until interrupted, without waking the loop to poll
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in [signal.SIGINT, signal.SIGTERM]:
+            loop.add_signal_handler(sig, stop_event.set)
+
+        # SIGINT sets stop_event instead of raising KeyboardInterrupt here
         try:
-            while True:
-                await asyncio.sleep(1)
-        except KeyboardInterrupt:
-            pass
+            await stop_event.wait()
         finally:
+            for sig in [signal.SIGINT, signal.SIGTERM]:
+                loop.remove_signal_handler(sig)
             await device.stop()
 
     except Exception as e:
@@ -1,354 +1,456 @@
 """UInput handler for generating Linux input events."""
 
+import array
 import asyncio
+import errno
 import logging
-from typing import List, Optional, Dict
-import evdev
+import os
+import struct
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Dict, Tuple
 from evdev import UInput, ecodes
-import time
 
 from .config import Config
-from .hid_parser import InputEvent, EventType
-from .keybind_manager import KeybindManager, KeybindAction, EventType as BindEventType
+from .hid_parser import InputEvent
+from .keybind_manager import (
+    KeybindManager, KeybindAction, NullKeybindManager, EventType as BindEventType, is_valid_key_code
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Event type codes used on every event, resolved once from evdev.ecodes
+_EV_KEY = ecodes.EV_KEY
+_EV_REL = ecodes.EV_REL
+_EV_SYN = ecodes.EV_SYN
+
+# struct input_event: struct timeval (two native longs), __u16 type,
+# __u16 code, __s32 value. A zero timestamp lets the kernel stamp the event.
+_INPUT_EVENT = struct.Struct('llHHi')
+_SYN_REPORT = _INPUT_EVENT.pack(0, 0, _EV_SYN, ecodes.SYN_REPORT, 0)
+
+# Relative axes advertised for scroll and movement
+_REL_CODES = array.array('H', [ecodes.REL_X, ecodes.REL_Y, ecodes.REL_WHEEL, ecodes.REL_HWHEEL])
+
+
+# Key names accepted in bindings. Every name is the evdev constant of the
+# same name except for the aliases below.
+_KEY_NAMES = (
+    # Function keys (F1-F24)
+    'KEY_F1', 'KEY_F2', 'KEY_F3', 'KEY_F4', 'KEY_F5', 'KEY_F6', 'KEY_F7',
+    'KEY_F8', 'KEY_F9', 'KEY_F10', 'KEY_F11', 'KEY_F12', 'KEY_F13', 'KEY_F14',
+    'KEY_F15', 'KEY_F16', 'KEY_F17', 'KEY_F18', 'KEY_F19', 'KEY_F20',
+    'KEY_F21', 'KEY_F22', 'KEY_F23', 'KEY_F24',
+
+    # Letters (A-Z)
+    'KEY_A', 'KEY_B', 'KEY_C', 'KEY_D', 'KEY_E', 'KEY_F', 'KEY_G', 'KEY_H',
+    'KEY_I', 'KEY_J', 'KEY_K', 'KEY_L', 'KEY_M', 'KEY_N', 'KEY_O', 'KEY_P',
+    'KEY_Q', 'KEY_R', 'KEY_S', 'KEY_T', 'KEY_U', 'KEY_V', 'KEY_W', 'KEY_X',
+    'KEY_Y', 'KEY_Z',
+
+    # Numbers (0-9)
+    'KEY_0', 'KEY_1', 'KEY_2', 'KEY_3', 'KEY_4', 'KEY_5', 'KEY_6', 'KEY_7',
+    'KEY_8', 'KEY_9',
+
+    # Modifier keys
+    'KEY_LEFTCTRL', 'KEY_RIGHTCTRL', 'KEY_LEFTSHIFT', 'KEY_RIGHTSHIFT',
+    'KEY_LEFTALT', 'KEY_RIGHTALT', 'KEY_LEFTMETA', 'KEY_RIGHTMETA',
+    'KEY_CAPSLOCK', 'KEY_NUMLOCK', 'KEY_SCROLLLOCK',
+
+    # Navigation keys
+    'KEY_UP', 'KEY_DOWN', 'KEY_LEFT', 'KEY_RIGHT', 'KEY_HOME', 'KEY_END',
+    'KEY_PAGEUP', 'KEY_PAGEDOWN', 'KEY_INSERT', 'KEY_DELETE',
+
+    # Special keys
+    'KEY_ENTER', 'KEY_SPACE', 'KEY_TAB', 'KEY_BACKSPACE', 'KEY_ESC',
+    'KEY_PAUSE', 'KEY_PRINTSCREEN', 'KEY_MENU',
+
+    # Punctuation keys
+    'KEY_GRAVE', 'KEY_MINUS', 'KEY_EQUAL', 'KEY_LEFTBRACE', 'KEY_RIGHTBRACE',
+    'KEY_BACKSLASH', 'KEY_SEMICOLON', 'KEY_APOSTROPHE', 'KEY_COMMA', 'KEY_DOT',
+    'KEY_SLASH',
+
+    # Numpad keys
+    'KEY_KP0', 'KEY_KP1', 'KEY_KP2', 'KEY_KP3', 'KEY_KP4', 'KEY_KP5',
+    'KEY_KP6', 'KEY_KP7', 'KEY_KP8', 'KEY_KP9', 'KEY_KPDOT', 'KEY_KPENTER',
+    'KEY_KPPLUS', 'KEY_KPMINUS', 'KEY_KPASTERISK', 'KEY_KPSLASH',
+    'KEY_KPEQUAL',
+
+    # Media keys
+    'KEY_VOLUMEUP', 'KEY_VOLUMEDOWN', 'KEY_MUTE', 'KEY_PLAYPAUSE',
+    'KEY_NEXTSONG', 'KEY_PREVIOUSSONG', 'KEY_STOPCD', 'KEY_EJECTCD',
+    'KEY_FASTFORWARD', 'KEY_REWIND', 'KEY_RECORD',
+
+    # System keys
+    'KEY_POWER', 'KEY_SLEEP', 'KEY_WAKEUP', 'KEY_SUSPEND', 'KEY_BRIGHTNESSUP',
+    'KEY_BRIGHTNESSDOWN', 'KEY_BRIGHTNESS_AUTO', 'KEY_BRIGHTNESS_CYCLE',
+    'KEY_BRIGHTNESS_ZERO', 'KEY_BRIGHTNESS_MAX', 'KEY_BRIGHTNESS_MIN',
+    'KEY_BRIGHTNESS_TOGGLE',
+
+    # Connectivity keys
+    'KEY_BLUETOOTH', 'KEY_WLAN', 'KEY_RFKILL',
+
+    # Additional common keys
+    'KEY_CALCULATOR', 'KEY_MAIL', 'KEY_COMPUTER', 'KEY_HOMEPAGE', 'KEY_BACK',
+    'KEY_FORWARD', 'KEY_REFRESH', 'KEY_SEARCH', 'KEY_BOOKMARKS', 'KEY_BATTERY',
+    'KEY_CAMERA', 'KEY_PHONE', 'KEY_MICMUTE', 'KEY_TOUCHPAD_TOGGLE',
+    'KEY_TOUCHPAD_ON', 'KEY_TOUCHPAD_OFF',
+
+    # Mouse buttons
+    'BTN_LEFT', 'BTN_RIGHT', 'BTN_MIDDLE', 'BTN_SIDE', 'BTN_EXTRA',
+    'BTN_FORWARD', 'BTN_BACK', 'BTN_TASK',
+)
+
+# Friendlier names for keys whose evdev constant is named differently
+_KEY_ALIASES = {
+    'KEY_PRINTSCREEN': 'KEY_SYSRQ',
+    'KEY_CALCULATOR': 'KEY_CALC',
+}
+
+# Key names mapped to evdev key codes. Built once at import and read-only, so
+# it can be shared by every handler. Names missing from an older evdev are
+# skipped.
+KEY_MAPPING: Mapping[str, int] = MappingProxyType({
+    name: getattr(ecodes, _KEY_ALIASES.get(name, name))
+    for name in _KEY_NAMES
+    if hasattr(ecodes, _KEY_ALIASES.get(name, name))
+})
+_SUPPORTED_KEY_NAMES = tuple(KEY_MAPPING)
+
 
 class UInputHandler:
     """Handles creation of virtual input device and event generation."""
 
-    # Comprehensive mapping of key names to evdev key codes
-    KEY_MAPPING = {
-        # Function keys (F1-F24)
-        'KEY_F1': ecodes.KEY_F1,
-        'KEY_F2': ecodes.KEY_F2,
-        'KEY_F3': ecodes.KEY_F3,
-        'KEY_F4': ecodes.KEY_F4,
-        'KEY_F5': ecodes.KEY_F5,
-        'KEY_F6': ecodes.KEY_F6,
-        'KEY_F7': ecodes.KEY_F7,
-        'KEY_F8': ecodes.KEY_F8,
-        'KEY_F9': ecodes.KEY_F9,
-        'KEY_F10': ecodes.KEY_F10,
-        'KEY_F11': ecodes.KEY_F11,
-        'KEY_F12': ecodes.KEY_F12,
-        'KEY_F13': ecodes.KEY_F13,
-        'KEY_F14': ecodes.KEY_F14,
-        'KEY_F15': ecodes.KEY_F15,
-        'KEY_F16': ecodes.KEY_F16,
-        'KEY_F17': ecodes.KEY_F17,
-        'KEY_F18': ecodes.KEY_F18,
-        'KEY_F19': ecodes.KEY_F19,
-        'KEY_F20': ecodes.KEY_F20,
-        'KEY_F21': ecodes.KEY_F21,
-        'KEY_F22': ecodes.KEY_F22,
-        'KEY_F23': ecodes.KEY_F23,
-        'KEY_F24': ecodes.KEY_F24,
-
-        # Letters (A-Z)
-        'KEY_A': ecodes.KEY_A,
-        'KEY_B': ecodes.KEY_B,
-        'KEY_C': ecodes.KEY_C,
-        'KEY_D': ecodes.KEY_D,
-        'KEY_E': ecodes.KEY_E,
-        'KEY_F': ecodes.KEY_F,
-        'KEY_G': ecodes.KEY_G,
-        'KEY_H': ecodes.KEY_H,
-        'KEY_I': ecodes.KEY_I,
-        'KEY_J': ecodes.KEY_J,
-        'KEY_K': ecodes.KEY_K,
-        'KEY_L': ecodes.KEY_L,
-        'KEY_M': ecodes.KEY_M,
-        'KEY_N': ecodes.KEY_N,
-        'KEY_O': ecodes.KEY_O,
-        'KEY_P': ecodes.KEY_P,
-        'KEY_Q': ecodes.KEY_Q,
-        'KEY_R': ecodes.KEY_R,
-        'KEY_S': ecodes.KEY_S,
-        'KEY_T': ecodes.KEY_T,
-        'KEY_U': ecodes.KEY_U,
-        'KEY_V': ecodes.KEY_V,
-        'KEY_W': ecodes.KEY_W,
-        'KEY_X': ecodes.KEY_X,
-        'KEY_Y': ecodes.KEY_Y,
-        'KEY_Z': ecodes.KEY_Z,
-
-        # Numbers (0-9)
-        'KEY_0': ecodes.KEY_0,
-        'KEY_1': ecodes.KEY_1,
-        'KEY_2': ecodes.KEY_2,
-        'KEY_3': ecodes.KEY_3,
-        'KEY_4': ecodes.KEY_4,
-        'KEY_5': ecodes.KEY_5,
-        'KEY_6': ecodes.KEY_6,
-        'KEY_7': ecodes.KEY_7,
-        'KEY_8': ecodes.KEY_8,
-        'KEY_9': ecodes.KEY_9,
-
-        # Modifier keys
-        'KEY_LEFTCTRL': ecodes.KEY_LEFTCTRL,
-        'KEY_RIGHTCTRL': ecodes.KEY_RIGHTCTRL,
-        'KEY_LEFTSHIFT': ecodes.KEY_LEFTSHIFT,
-        'KEY_RIGHTSHIFT': ecodes.KEY_RIGHTSHIFT,
-        'KEY_LEFTALT': ecodes.KEY_LEFTALT,
-        'KEY_RIGHTALT': ecodes.KEY_RIGHTALT,
-        'KEY_LEFTMETA': ecodes.KEY_LEFTMETA,
-        'KEY_RIGHTMETA': ecodes.KEY_RIGHTMETA,
-        'KEY_CAPSLOCK': ecodes.KEY_CAPSLOCK,
-        'KEY_NUMLOCK': ecodes.KEY_NUMLOCK,
-        'KEY_SCROLLLOCK': ecodes.KEY_SCROLLLOCK,
-
-        # Navigation keys
-        'KEY_UP': ecodes.KEY_UP,
-        'KEY_DOWN': ecodes.KEY_DOWN,
-        'KEY_LEFT': ecodes.KEY_LEFT,
-        'KEY_RIGHT': ecodes.KEY_RIGHT,
-        'KEY_HOME': ecodes.KEY_HOME,
-        'KEY_END': ecodes.KEY_END,
-        'KEY_PAGEUP': ecodes.KEY_PAGEUP,
-        'KEY_PAGEDOWN': ecodes.KEY_PAGEDOWN,
-        'KEY_INSERT': ecodes.KEY_INSERT,
-        'KEY_DELETE': ecodes.KEY_DELETE,
-
-        # Special keys
-        'KEY_ENTER': ecodes.KEY_ENTER,
-        'KEY_SPACE': ecodes.KEY_SPACE,
-        'KEY_TAB': ecodes.KEY_TAB,
-        'KEY_BACKSPACE': ecodes.KEY_BACKSPACE,
-        'KEY_ESC': ecodes.KEY_ESC,
-        'KEY_PAUSE': ecodes.KEY_PAUSE,
-        'KEY_PRINTSCREEN': ecodes.KEY_SYSRQ,
-        'KEY_MENU': ecodes.KEY_MENU,
-
-        # Punctuation keys
-        'KEY_GRAVE': ecodes.KEY_GRAVE,
-        'KEY_MINUS': ecodes.KEY_MINUS,
-        'KEY_EQUAL': ecodes.KEY_EQUAL,
-        'KEY_LEFTBRACE': ecodes.KEY_LEFTBRACE,
-        'KEY_RIGHTBRACE': ecodes.KEY_RIGHTBRACE,
-        'KEY_BACKSLASH': ecodes.KEY_BACKSLASH,
-        'KEY_SEMICOLON': ecodes.KEY_SEMICOLON,
-        'KEY_APOSTROPHE': ecodes.KEY_APOSTROPHE,
-        'KEY_COMMA': ecodes.KEY_COMMA,
-        'KEY_DOT': ecodes.KEY_DOT,
-        'KEY_SLASH': ecodes.KEY_SLASH,
-
-        # Numpad keys
-        'KEY_KP0': ecodes.KEY_KP0,
-        'KEY_KP1': ecodes.KEY_KP1,
-        'KEY_KP2': ecodes.KEY_KP2,
-        'KEY_KP3': ecodes.KEY_KP3,
-        'KEY_KP4': ecodes.KEY_KP4,
-        'KEY_KP5': ecodes.KEY_KP5,
-        'KEY_KP6': ecodes.KEY_KP6,
-        'KEY_KP7': ecodes.KEY_KP7,
-        'KEY_KP8': ecodes.KEY_KP8,
-        'KEY_KP9': ecodes.KEY_KP9,
-        'KEY_KPDOT': ecodes.KEY_KPDOT,
-        'KEY_KPENTER': ecodes.KEY_KPENTER,
-        'KEY_KPPLUS': ecodes.KEY_KPPLUS,
-        'KEY_KPMINUS': ecodes.KEY_KPMINUS,
-        'KEY_KPASTERISK': ecodes.KEY_KPASTERISK,
-        'KEY_KPSLASH': ecodes.KEY_KPSLASH,
-        'KEY_KPEQUAL': ecodes.KEY_KPEQUAL,
-
-        # Media keys
-        'KEY_VOLUMEUP': ecodes.KEY_VOLUMEUP,
-        'KEY_VOLUMEDOWN': ecodes.KEY_VOLUMEDOWN,
-        'KEY_MUTE': ecodes.KEY_MUTE,
-        'KEY_PLAYPAUSE': ecodes.KEY_PLAYPAUSE,
-        'KEY_NEXTSONG': ecodes.KEY_NEXTSONG,
-        'KEY_PREVIOUSSONG': ecodes.KEY_PREVIOUSSONG,
-        'KEY_STOPCD': ecodes.KEY_STOPCD,
-        'KEY_EJECTCD': ecodes.KEY_EJECTCD,
-        'KEY_FASTFORWARD': ecodes.KEY_FASTFORWARD,
-        'KEY_REWIND': ecodes.KEY_REWIND,
-        'KEY_RECORD': ecodes.KEY_RECORD,
-
-        # System keys
-        'KEY_POWER': ecodes.KEY_POWER,
-        'KEY_SLEEP': ecodes.KEY_SLEEP,
-        'KEY_WAKEUP': ecodes.KEY_WAKEUP,
-        'KEY_SUSPEND': ecodes.KEY_SUSPEND,
-        'KEY_BRIGHTNESSUP': ecodes.KEY_BRIGHTNESSUP,
-        'KEY_BRIGHTNESSDOWN': ecodes.KEY_BRIGHTNESSDOWN,
-        'KEY_BRIGHTNESS_AUTO': ecodes.KEY_BRIGHTNESS_AUTO,
-        'KEY_BRIGHTNESS_CYCLE': ecodes.KEY_BRIGHTNESS_CYCLE,
-        'KEY_BRIGHTNESS_ZERO': ecodes.KEY_BRIGHTNESS_ZERO,
-        'KEY_BRIGHTNESS_MAX': ecodes.KEY_BRIGHTNESS_MAX,
-        'KEY_BRIGHTNESS_MIN': ecodes.KEY_BRIGHTNESS_MIN,
-        'KEY_BRIGHTNESS_TOGGLE': ecodes.KEY_BRIGHTNESS_TOGGLE,
-
-        # Connectivity keys
-        'KEY_BLUETOOTH': ecodes.KEY_BLUETOOTH,
-        'KEY_WLAN': ecodes.KEY_WLAN,
-        'KEY_RFKILL': ecodes.KEY_RFKILL,
-
-        # Additional common keys
-        'KEY_CALCULATOR': ecodes.KEY_CALC,
-        'KEY_MAIL': ecodes.KEY_MAIL,
-        'KEY_COMPUTER': ecodes.KEY_COMPUTER,
-        'KEY_HOMEPAGE': ecodes.KEY_HOMEPAGE,
-        'KEY_BACK': ecodes.KEY_BACK,
-        'KEY_FORWARD': ecodes.KEY_FORWARD,
-        'KEY_REFRESH': ecodes.KEY_REFRESH,
-        'KEY_SEARCH': ecodes.KEY_SEARCH,
-        'KEY_BOOKMARKS': ecodes.KEY_BOOKMARKS,
-        'KEY_BATTERY': ecodes.KEY_BATTERY,
-        'KEY_CAMERA': ecodes.KEY_CAMERA,
-        'KEY_PHONE': ecodes.KEY_PHONE,
-        'KEY_MICMUTE': ecodes.KEY_MICMUTE,
-        'KEY_TOUCHPAD_TOGGLE': ecodes.KEY_TOUCHPAD_TOGGLE,
-        'KEY_TOUCHPAD_ON': ecodes.KEY_TOUCHPAD_ON,
-        'KEY_TOUCHPAD_OFF': ecodes.KEY_TOUCHPAD_OFF,
-
-        # Mouse buttons
-        'BTN_LEFT': ecodes.BTN_LEFT,
-        'BTN_RIGHT': ecodes.BTN_RIGHT,
-        'BTN_MIDDLE': ecodes.BTN_MIDDLE,
-        'BTN_SIDE': ecodes.BTN_SIDE,
-        'BTN_EXTRA': ecodes.BTN_EXTRA,
-        'BTN_FORWARD': ecodes.BTN_FORWARD,
-        'BTN_BACK': ecodes.BTN_BACK,
-        'BTN_TASK': ecodes.BTN_TASK,
-    }
+    # Shared module-level mapping, kept here for existing callers
+    KEY_MAPPING = KEY_MAPPING
 
     def __init__(self, config: Config, keybind_manager: Optional[KeybindManager] = None):
         self.config = config
-        self.keybind_manager = keybind_manager
+        self.keybind_manager = keybind_manager or NullKeybindManager()
         self.device: Optional[UInput] = None
-        self.capabilities = self._build_capabilities()
-        self._try_open_device()
-
-    def _try_open_device(self):
-        """Try to open the existing uinput device."""
-        max_retries = 30  # Wait up to 30 seconds
-        retry_delay = 1.0
+        # Raw fd of self.device, cached for the event write path
+        self._fd: Optional[int] = None
+        # Action type -> frame builder
+        self._dispatch = {
+            BindEventType.KEYBOARD: self._keyboard_frame,
+        }
+        self._key_codes = self._build_key_codes()
+        # Key codes the open device actually advertises; narrower than
+        # _key_codes if the kernel refused the full set
+        self._device_key_codes: Optional[array.array] = None
+        # Pending reopen for runtime bindings the device doesn't advertise
+        self._reopen_task: Optional[asyncio.Task] = None
+        # The device is opened by start()
+
+    async def start(self):
+        """Open the uinput device without blocking the event loop."""
+        await self._try_open_device_async()
+
+    async def stop(self):
+        """Close the uinput device."""
+        if self._reopen_task and not self._reopen_task.done():
+            self._reopen_task.cancel()
+            try:
+                await self._reopen_task
+            except asyncio.CancelledError:
+                pass
+        self._close_device()
+
+    def _open_device(self):
+        """Open the uinput device once, narrowing capabilities if the kernel
+        refuses the full key set."""
+        key_codes = self._key_codes
+        try:
+            self.device = UInput(events=self._capabilities(key_codes), name=self.config.uinput_device_name)
+        except OSError as e:
+            if e.errno not in (errno.ENOMEM, errno.ENOSPC):
+                raise
+            # Advertise only the keys that are actually bound and try again.
+            # The narrowed set only applies to this device; the next open
+            # tries the full set again.
+            logger.warning(f"uinput device rejected full key set ({e}), retrying with bound keys only")
+            key_codes = self._build_key_codes(all_keys=False)
+            self.device = UInput(events=self._capabilities(key_codes), name=self.config.uinput_device_name)
+
+        self._device_key_codes = key_codes
+        self._fd = self.device.fd
+        logger.info(f"Successfully opened uinput device '{self.config.uinput_device_name}'")
+
+    async def _try_open_device_async(self, timeout: float = 30.0, poll_interval: float = 0.1):
+        """Try to open the uinput device, polling until it becomes available.
+
+        Polls at a short interval with asyncio.sleep, so startup continues
+        soon after /dev/uinput becomes usable and the loop stays free while
+        waiting.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
 
         logger.info(f"Waiting for uinput device '{self.config.uinput_device_name}' to be available...")
 
-        for attempt in range(max_retries):
+        while True:
             try:
-                self.device = UInput(events=self.capabilities, name=self.config.uinput_device_name)
-                logger.info(f"Successfully opened uinput device '{self.config.uinput_device_name}'")
+                self._open_device()
                 return
             except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.info(f"Waiting for uinput device... (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"Failed to open uinput device '{self.config.uinput_device_name}' after {max_retries} attempts: {e}")
-                    raise RuntimeError(f"uinput device not available after {max_retries} seconds")
-
-    def _build_capabilities(self) -> Dict:
-        """Build device capabilities based on configuration and keybind manager."""
-        capabilities = {
-            evdev.ecodes.EV_KEY: [],
+                if loop.time() >= deadline:
+                    logger.error(f"Failed to open uinput device '{self.config.uinput_device_name}' after {timeout:.0f} seconds: {e}")
+                    raise RuntimeError(f"uinput device not available after {timeout:.0f} seconds")
+                await asyncio.sleep(poll_interval)
+
+    def _build_key_codes(self, all_keys: bool = True) -> array.array:
+        """Build the sorted key codes the device advertises.
+
+        By default every key in KEY_MAPPING is advertised so runtime bindings
+        can use any key without reopening the device. With all_keys=False only
+        the keys bound right now are included.
+        """
+        if all_keys:
+            # Add all possible keys that might be used
+            key_codes = {key_code for key_code in self.KEY_MAPPING.values() if key_code}
+        else:
+            key_codes = set()
+
+        # Add keys from the keybind manager, resolving each action's key codes
+        # up front so the event path doesn't have to
+        for action in self.keybind_manager.get_all_actions().values():
+            key_codes.update(self._resolve_action_keys(action))
+            self._action_frames(action)
+
+        # Key codes fit in 16 bits; a flat array is compact and compares
+        # element-wise when checking whether a reopen is needed
+        return array.array('H', sorted(key_codes))
+
+    @property
+    def capabilities(self) -> Dict:
+        """Device capabilities in the form UInput expects.
+
+        Only built when the device is opened; the handler itself keeps just
+        the key code array.
+        """
+        return self._capabilities(self._key_codes)
+
+    @staticmethod
+    def _capabilities(key_codes: array.array) -> Dict:
+        """Build UInput capabilities advertising the given key codes."""
+        return {
+            _EV_KEY: key_codes,
             # Add mouse relative events for scroll and movement
-            evdev.ecodes.EV_REL: [evdev.ecodes.REL_X, evdev.ecodes.REL_Y, evdev.ecodes.REL_WHEEL, evdev.ecodes.REL_HWHEEL],
+            _EV_REL: _REL_CODES,
         }
 
-        # Add all possible keys that might be used
-        for key_name in self.KEY_MAPPING.keys():
-            key_code = self.KEY_MAPPING.get(key_name)
-            if key_code and key_code not in capabilities[evdev.ecodes.EV_KEY]:
-                capabilities[evdev.ecodes.EV_KEY].append(key_code)
-
-        # Add keys from keybind manager if available
-        if self.keybind_manager:
-            for action in self.keybind_manager.get_all_actions().values():
-                if action.keys:
-                    for key_name in action.keys:
-                        key_code = self.KEY_MAPPING.get(key_name)
-                        if key_code and key_code not in capabilities[evdev.ecodes.EV_KEY]:
-                            capabilities[evdev.ecodes.EV_KEY].append(key_code)
-
-        return capabilities
-
-    async def send_event(self, event: InputEvent):
-        """Send an input event to the virtual device."""
+    def send_event(self, event: InputEvent):
+        """Send an input event to the virtual device.
+
+        uinput writes don't block, so this does no awaiting and can be called
+        straight from the notification handler without creating a coroutine.
+        """
+        self.send_events((event,))
+
+    def send_events(self, events: Iterable[InputEvent]):
+        """Send the events parsed from one HID report with a single write.
+
+        Each event's frame ends in its own SYN_REPORT, so consumers still see
+        them as separate, ordered frames.
+        """
         if not self.device:
             logger.warning("No virtual device available")
             return
 
         try:
-            # Get the action ID from the event
-            action_id = self._get_action_id_from_event(event)
-            if not action_id:
-                logger.debug(f"No action ID found for event: {event}")
-                return
+            frames = b''.join([self._event_frame(event) for event in events])
+            if frames:
+                self._write_frame(frames)
 
-            # Get the keybind action from the manager
-            if not self.keybind_manager:
-                logger.warning("No keybind manager available")
-                return
+        except Exception as e:
+            logger.error(f"Error sending events: {e}")
 
+    def _event_frame(self, event: InputEvent) -> bytes:
+        """Get the packed frame for an event, or b'' if it isn't bound."""
+        # Get the action ID from the event
+        action_id = event.key_code
+        if action_id is None:
+            logger.debug("No action ID found for event: %s", event)
+            return b''
+
+        # A bad binding only drops its own event, not the rest of the report
+        try:
+            # Get the keybind action from the manager
             action = self.keybind_manager.get_action(action_id)
             if not action:
-                logger.debug(f"No binding found for action: {action_id}")
-                return
+                logger.debug("No binding found for action: %s", action_id)
+                return b''
+
+            # Build the frame based on the action type
+            action_type = action.type
+            builder = self._dispatch.get(action_type)
+            if builder is None:
+                logger.warning(f"Unknown action type: {action_type}")
+                return b''
+            return builder(action, event)
+        except Exception as e:
+            logger.error(f"Error building event for {action_id}: {e}")
+            return b''
 
-            # Execute the action based on its type
-            if action.type == BindEventType.KEYBOARD:
-                await self._send_keyboard_action(action, event)
+    def _keyboard_frame(self, action: KeybindAction, event: InputEvent) -> bytes:
+        """Get the frame for a keyboard action."""
+        keys = action.keys
+        if not keys:
+            logger.warning("Keyboard action has no keys defined")
+            return b''
+
+        if action._frames is None:
+            # First use of a binding, possibly one added at runtime
+            self._check_advertised(action)
+        press_frame, release_frame = self._action_frames(action)
+        if event.is_press:
+            # Lazy %-formatting: nothing is built unless debug logging is on
+            logger.debug("Pressed keys: %r", keys)
+            return press_frame
+        logger.debug("Released keys: %r", keys)
+        return release_frame
+
+    def _resolve_action_keys(self, action: KeybindAction) -> Tuple[int, ...]:
+        """Get the key codes for an action, resolving and caching them on first use."""
+        key_codes = action._resolved_keys
+        if key_codes is None:
+            resolved = []
+            for key_name in action.keys or ():
+                # Bindings set up programmatically may already be key codes;
+                # out-of-range ints would fail to pack and drop the whole report
+                if isinstance(key_name, str):
+                    key_code = self.KEY_MAPPING.get(key_name)
+                else:
+                    key_code = key_name if is_valid_key_code(key_name) else None
+                if key_code:
+                    resolved.append(key_code)
+                else:
+                    logger.warning(f"Unknown key: {key_name}")
+            key_codes = action._resolved_keys = tuple(resolved)
+        return key_codes
+
+    def _action_frames(self, action: KeybindAction) -> Tuple[bytes, bytes]:
+        """Get the packed (press, release) frames for an action.
+
+        Each frame is the action's key events followed by one SYN_REPORT:
+        keys go down in order and come up in reverse order. The frames only
+        depend on the binding, so they're built once and cached on the action.
+        """
+        frames = action._frames
+        if frames is None:
+            key_codes = self._resolve_action_keys(action)
+            if key_codes:
+                pack = _INPUT_EVENT.pack
+                press = b''.join([pack(0, 0, _EV_KEY, code, 1) for code in key_codes])
+                release = b''.join([pack(0, 0, _EV_KEY, code, 0) for code in reversed(key_codes)])
+                frames = (press + _SYN_REPORT, release + _SYN_REPORT)
             else:
-                logger.warning(f"Unknown action type: {action.type}")
+                frames = (b'', b'')
+            action._frames = frames
+        return frames
 
-        except Exception as e:
-            logger.error(f"Error sending event: {e}")
-
-    def _get_action_id_from_event(self, event: InputEvent) -> Optional[str]:
-        if event.key_code != None:
-            return event.key_code
-        else:
-            logger.warning(f"No keycode found for event: {event}")
-        return None
+    def _check_advertised(self, action: KeybindAction):
+        """Schedule a reopen if the open device doesn't advertise an action's keys.
 
-    async def _send_keyboard_action(self, action: KeybindAction, event: InputEvent):
-        """Send a keyboard action."""
-        if not action.keys:
-            logger.warning("Keyboard action has no keys defined")
+        The kernel drops key codes a uinput device wasn't created with, so a
+        raw code bound at runtime only works once the device is reopened.
+        """
+        if self._device_key_codes is None:
             return
-
-        if not self.device:
-            logger.warning("No virtual device available")
+        missing = set(self._resolve_action_keys(action)).difference(self._device_key_codes)
+        if not missing:
+            return
+        if self._reopen_task and not self._reopen_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning(f"Key codes {sorted(missing)} are not advertised by the uinput device")
             return
+        logger.warning(f"Key codes {sorted(missing)} are not advertised by the uinput device, reopening it")
+        self._reopen_task = loop.create_task(self._reopen_device())
 
-        # Determine if this is a press or release
-        is_press = event.event_type == EventType.KEY_PRESS
+    async def _reopen_device(self):
+        """Close the device and reopen it advertising every bound key.
 
+        Runs as a background task, so failures are logged here rather than
+        raised to a caller.
+        """
+        self._close_device()
+        self._key_codes = self._build_key_codes(all_keys=True)
         try:
-            if is_press:
-                # Press all keys in order
-                for key_name in action.keys:
-                    key_code = self.KEY_MAPPING.get(key_name)
-                    if key_code:
-                        self.device.write(evdev.ecodes.EV_KEY, key_code, 1)
-                        self.device.syn()
-                        logger.debug(f"Pressed key: {key_name}")
-                    else:
-                        logger.warning(f"Unknown key: {key_name}")
-            else:
-                # Release all keys in reverse order
-                for key_name in reversed(action.keys):
-                    key_code = self.KEY_MAPPING.get(key_name)
-                    if key_code:
-                        self.device.write(evdev.ecodes.EV_KEY, key_code, 0)
-                        self.device.syn()
-                        logger.debug(f"Released key: {key_name}")
-                    else:
-                        logger.warning(f"Unknown key: {key_name}")
-
+            await self._try_open_device_async()
         except Exception as e:
-            logger.error(f"Error sending keyboard action: {e}")
+            logger.error(f"Failed to reopen uinput device, no events will be sent until restart: {e}")
+
+    def _write_frame(self, frame: bytes):
+        """Write packed input_event records to the uinput device.
+
+        Short writes are retried with the remainder, so a trailing key
+        release or SYN_REPORT is never lost. Falls back to one UInput.write()
+        per record for whatever the raw fd didn't take.
+        """
+        if self._fd is not None:
+            remaining = memoryview(frame)
+            try:
+                while remaining:
+                    written = os.write(self._fd, remaining)
+                    if not written:
+                        break
+                    remaining = remaining[written:]
+            except OSError as e:
+                logger.debug("Raw uinput write failed (%s), falling back to UInput.write", e)
+            if not remaining:
+                return
+            # uinput accepts whole records, so the remainder starts on one
+            frame = remaining.tobytes()
+
+        write = self.device.write
+        for _, _, event_type, code, value in _INPUT_EVENT.iter_unpack(frame):
+            write(event_type, code, value)
 
     def get_supported_keys(self) -> List[str]:
         """Get list of supported key names."""
-        return list(self.KEY_MAPPING.keys())
+        return list(supported_key_names())
 
-    def set_keybind_manager(self, keybind_manager: KeybindManager):
-        """Set the keybind manager and rebuild capabilities."""
+    async def set_keybind_manager(self, keybind_manager: KeybindManager):
+        """Set the keybind manager, reopening the device if capabilities changed.
+
+        The reopen polls with _try_open_device_async, so the event loop keeps
+        running while /dev/uinput is unavailable. Without an open device only
+        the key codes are rebuilt; start() opens it with them.
+        """
         self.keybind_manager = keybind_manager
-        self.capabilities = self._build_capabilities()
+        # Always rebuild from the full key set, never from a device that was
+        # narrowed after ENOMEM
+        self._key_codes = self._build_key_codes(all_keys=True)
+        if not self.device:
+            logger.info("Updated keybind manager; no uinput device open yet")
+            return
+
+        # Compare against what the open device really advertises, so
+        # bindings missing from a narrowed device still trigger a reopen
+        bound_codes = self._build_key_codes(all_keys=False)
+        if set(self._device_key_codes).issuperset(bound_codes):
+            logger.info("Updated keybind manager; capabilities unchanged, keeping existing uinput device")
+            return
+
+        self._close_device()
+        await self._try_open_device_async()
         logger.info("Updated keybind manager and rebuilt capabilities")
+
+    def _close_device(self):
+        """Close the uinput device, releasing its fd."""
+        if self.device:
+            try:
+                self.device.close()
+            except Exception as e:
+                logger.warning(f"Error closing uinput device: {e}")
+            self.device = None
+            self._fd = None
+            self._device_key_codes = None
+
+
+def supported_key_names() -> Tuple[str, ...]:
+    """Get supported key names without opening a uinput device."""
+    return _SUPPORTED_KEY_NAMES
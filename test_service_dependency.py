@@ -1,26 +1,52 @@
 #!/usr/bin/env python3
 """Test script to verify user service functionality."""
 
-import asyncio
 import subprocess
 import sys
 import time
 
+SERVICE = "huion-keydial-mini-user.service"
+
+# UnitFileState values for which `systemctl is-enabled` succeeds
+_ENABLED_STATES = frozenset({
+    "enabled", "enabled-runtime", "static", "alias", "indirect", "generated", "transient",
+})
+
 def run_command(cmd, check=True):
-    """Run a command and return the result."""
+    """Run a command (argv list, no shell) and return the result."""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=check)
+        result = subprocess.run(cmd, capture_output=True, text=True, check=check)
         return result.returncode == 0, result.stdout, result.stderr
     except subprocess.CalledProcessError as e:
         return False, e.stdout, e.stderr
+    except OSError as e:
+        return False, "", str(e)
+
+def systemctl_show(units, user=True):
+    """Query ActiveState and UnitFileState for units with one systemctl call.
+
+    Returns {unit: {property: value}}.
+    """
+    cmd = ["systemctl"]
+    if user:
+        cmd.append("--user")
+    cmd += ["show", "--property=ActiveState,UnitFileState", *units]
+    _, stdout, _ = run_command(cmd, check=False)
+
+    states = {}
+    # One block of KEY=VALUE lines per unit, separated by blank lines
+    for unit, block in zip(units, stdout.split("\n\n")):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        states[unit] = props
+    return states
 
 def test_user_service():
     """Test that the user service can start and stop properly."""
     print("Testing user service functionality...")
 
     # Check if user service is installed
-    success, stdout, stderr = run_command("systemctl --user is-enabled huion-keydial-mini-user.service", check=False)
-    if not success:
+    state = systemctl_show([SERVICE])[SERVICE]
+    if state.get("UnitFileState") not in _ENABLED_STATES:
         print("❌ User service not found. Please install it first:")
         print("   sudo make install-systemd")
         return False
@@ -29,16 +55,16 @@ def test_user_service():
 
     # Stop service to start fresh
     print("Stopping user service...")
-    run_command("systemctl --user stop huion-keydial-mini-user.service", check=False)
+    run_command(["systemctl", "--user", "stop", SERVICE], check=False)
     time.sleep(2)
 
     # Check initial state
-    user_active, _, _ = run_command("systemctl --user is-active --quiet huion-keydial-mini-user.service", check=False)
+    user_active = systemctl_show([SERVICE])[SERVICE].get("ActiveState") == "active"
     print(f"Initial state - User service: {'active' if user_active else 'inactive'}")
 
     # Start user service
     print("Starting user service...")
-    success, stdout, stderr = run_command("systemctl --user start huion-keydial-mini-user.service")
+    success, stdout, stderr = run_command(["systemctl", "--user", "start", SERVICE])
     if not success:
         print(f"❌ Failed to start user service: {stderr}")
         return False
@@ -47,7 +73,7 @@ def test_user_service():
     time.sleep(3)
 
     # Check final state
-    user_active, _, _ = run_command("systemctl --user is-active --quiet huion-keydial-mini-user.service", check=False)
+    user_active = systemctl_show([SERVICE])[SERVICE].get("ActiveState") == "active"
     print(f"Final state - User service: {'active' if user_active else 'inactive'}")
 
     if user_active:
@@ -1,18 +1,30 @@
 """Pytest configuration and common fixtures for huion-keydial-mini-driver tests."""
 
+import copy
 import pytest
-import tempfile
 import yaml
-from pathlib import Path
-from unittest.mock import Mock
 
-from huion_keydial_mini.config import Config
-from huion_keydial_mini.hid_parser import HIDParser, EventType, InputEvent
+from huion_keydial_mini.config import Config, SafeDumper
+from huion_keydial_mini.hid_parser import HIDParser
 
 
-@pytest.fixture
-def sample_config_data():
-    """Sample configuration data for testing."""
+def pytest_collection_modifyitems(config, items):
+    """Group tests by class for pytest-xdist's loadgroup distribution.
+
+    With `pytest -n auto --dist loadgroup`, each test class runs on a single
+    worker, so its session-scoped fixtures are built once per class rather
+    than once per worker.
+    """
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+    for item in items:
+        if item.cls is not None:
+            item.add_marker(pytest.mark.xdist_group(item.cls.__name__))
+
+
+@pytest.fixture(scope="session")
+def _base_config_data():
+    """Sample configuration data, built once per test session."""
     return {
         'device': {
             'name': 'Huion Keydial Mini',
@@ -46,33 +58,45 @@ def sample_config_data():
 
 
 @pytest.fixture
-def temp_config_file(sample_config_data):
+def sample_config_data(_base_config_data):
+    """Sample configuration data for testing, safe to mutate."""
+    return copy.deepcopy(_base_config_data)
+
+
+@pytest.fixture
+def temp_config_file(sample_config_data, tmp_path):
     """Create a temporary config file for testing."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        yaml.dump(sample_config_data, f)
-        temp_path = f.name
+    config_path = tmp_path / 'config.yaml'
+    with open(config_path, 'w') as f:
+        yaml.dump(sample_config_data, f, Dumper=SafeDumper)
+    return str(config_path)
 
-    yield temp_path
 
-    # Cleanup
-    Path(temp_path).unlink(missing_ok=True)
+@pytest.fixture(scope="session")
+def config(_base_config_data):
+    """Create a Config instance shared by the whole test session."""
+    return Config(_base_config_data)
 
 
-@pytest.fixture
-def config(sample_config_data):
-    """Create a Config instance for testing."""
-    return Config(sample_config_data)
+@pytest.fixture(scope="session")
+def _shared_hid_parser(config):
+    """HIDParser built once per test session."""
+    return HIDParser(config)
 
 
 @pytest.fixture
-def hid_parser(config):
-    """Create a HIDParser instance for testing."""
-    return HIDParser(config)
+def hid_parser(_shared_hid_parser):
+    """Provide the shared HIDParser with its state reset for this test."""
+    _shared_hid_parser.reset_state()
+    return _shared_hid_parser
 
 
 @pytest.fixture
 def mock_logger(monkeypatch):
     """Mock the logger to avoid output during tests."""
+    # Imported here so runs that don't use this fixture never load unittest.mock
+    from unittest.mock import Mock
+
     mock_logger = Mock()
     monkeypatch.setattr('huion_keydial_mini.hid_parser.logger', mock_logger)
     return mock_logger
@@ -83,30 +107,30 @@ class HIDTestData:
 
     # Button report format (type 2 buttons using bitmasking in first byte)
     # button 13: bit 0, button 14: bit 2, button 15: bit 1
-    BUTTON_13_PRESS = bytearray([0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 13 pressed (bit 0)
-    BUTTON_14_PRESS = bytearray([0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 14 pressed (bit 2)
-    BUTTON_15_PRESS = bytearray([0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 15 pressed (bit 1)
-    BUTTON_RELEASE = bytearray([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # All buttons released
-    MULTIPLE_BUTTONS = bytearray([0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Buttons 13 and 15 pressed (bits 0+1)
+    BUTTON_13_PRESS = bytes([0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 13 pressed (bit 0)
+    BUTTON_14_PRESS = bytes([0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 14 pressed (bit 2)
+    BUTTON_15_PRESS = bytes([0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Button 15 pressed (bit 1)
+    BUTTON_RELEASE = bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # All buttons released
+    MULTIPLE_BUTTONS = bytes([0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Buttons 13 and 15 pressed (bits 0+1)
 
     # Type 1 button format (buttons in bytes 3-5)
-    BUTTON_1_PRESS = bytearray([0x00, 0x00, 0x00, 0x0e, 0x00, 0x00, 0x00, 0x00])  # Button 1 (0x0e in byte 3)
-    BUTTON_2_PRESS = bytearray([0x00, 0x00, 0x00, 0x0a, 0x00, 0x00, 0x00, 0x00])  # Button 2 (0x0a in byte 3)
-    BUTTON_3_PRESS = bytearray([0x00, 0x00, 0x00, 0x0f, 0x00, 0x00, 0x00, 0x00])  # Button 3 (0x0f in byte 3)
+    BUTTON_1_PRESS = bytes([0x00, 0x00, 0x00, 0x0e, 0x00, 0x00, 0x00, 0x00])  # Button 1 (0x0e in byte 3)
+    BUTTON_2_PRESS = bytes([0x00, 0x00, 0x00, 0x0a, 0x00, 0x00, 0x00, 0x00])  # Button 2 (0x0a in byte 3)
+    BUTTON_3_PRESS = bytes([0x00, 0x00, 0x00, 0x0f, 0x00, 0x00, 0x00, 0x00])  # Button 3 (0x0f in byte 3)
 
     # Dial report format: f1[clicked][count][direction]0000000000 (9 bytes)
-    DIAL_CW = bytearray([0xf1, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Clockwise rotation (count=1, direction=0x00)
-    DIAL_CCW = bytearray([0xf1, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00])  # Counter-clockwise rotation (count=0xff, direction=0xff)
-    DIAL_CLICK = bytearray([0xf1, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Dial click (clicked=0x03, count=0x00)
-    DIAL_CLICK_RELEASE = bytearray([0xf1, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Dial click release
+    DIAL_CW = bytes([0xf1, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Clockwise rotation (count=1, direction=0x00)
+    DIAL_CCW = bytes([0xf1, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00])  # Counter-clockwise rotation (count=0xff, direction=0xff)
+    DIAL_CLICK = bytes([0xf1, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Dial click (clicked=0x03, count=0x00)
+    DIAL_CLICK_RELEASE = bytes([0xf1, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Dial click release
 
     # Edge cases
-    EMPTY_DATA = bytearray([])
-    SHORT_DATA = bytearray([0x01])
-    INVALID_DATA = bytearray([0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF])
+    EMPTY_DATA = bytes([])
+    SHORT_DATA = bytes([0x01])
+    INVALID_DATA = bytes([0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def hid_test_data():
     """Provide common HID test data."""
     return HIDTestData()
@@ -1,15 +1,35 @@
 """Tests for button combo support in configuration files."""
 
+import logging
 import pytest
-import tempfile
 import yaml
-from pathlib import Path
-from unittest.mock import Mock, patch, call
 
-from huion_keydial_mini.config import Config
+from huion_keydial_mini.config import Config, SafeDumper
 from huion_keydial_mini.keybind_manager import KeybindManager
 
 
+@pytest.fixture(scope="module")
+def unsorted_combo_config_data():
+    """Config data with unsorted combo mappings to test normalization."""
+    return {
+        'key_mappings': {
+            # Combos in various orders (should all normalize)
+            'BUTTON_3+BUTTON_1': 'KEY_ALT+KEY_TAB',
+            'BUTTON_2+BUTTON_1+BUTTON_3': 'KEY_CTRL+KEY_SHIFT+KEY_A',
+            'BUTTON_18+BUTTON_1+BUTTON_10': 'KEY_F12',
+            'BUTTON_5+BUTTON_2': 'KEY_ESC',
+        },
+        'dial_settings': {},
+        'debug_mode': True,
+    }
+
+
+@pytest.fixture(scope="module")
+def unsorted_manager(unsorted_combo_config_data):
+    """KeybindManager loaded from the unsorted combo config, shared across the module."""
+    return KeybindManager(Config(unsorted_combo_config_data))
+
+
 class TestConfigComboSupport:
     """Test cases for combo support in configuration files."""
 
@@ -66,31 +86,12 @@ class TestConfigComboSupport:
         }
 
     @pytest.fixture
-    def unsorted_combo_config_data(self):
-        """Config data with unsorted combo mappings to test normalization."""
-        return {
-            'key_mappings': {
-                # Combos in various orders (should all normalize)
-                'BUTTON_3+BUTTON_1': 'KEY_ALT+KEY_TAB',
-                'BUTTON_2+BUTTON_1+BUTTON_3': 'KEY_CTRL+KEY_SHIFT+KEY_A',
-                'BUTTON_18+BUTTON_1+BUTTON_10': 'KEY_F12',
-                'BUTTON_5+BUTTON_2': 'KEY_ESC',
-            },
-            'dial_settings': {},
-            'debug_mode': True,
-        }
-
-    @pytest.fixture
-    def temp_combo_config_file(self, basic_combo_config_data):
+    def temp_combo_config_file(self, basic_combo_config_data, tmp_path):
         """Create a temporary config file with combo mappings."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(basic_combo_config_data, f)
-            temp_path = f.name
-
-        yield temp_path
-
-        # Cleanup
-        Path(temp_path).unlink(missing_ok=True)
+        config_path = tmp_path / 'config.yaml'
+        with open(config_path, 'w') as f:
+            yaml.dump(basic_combo_config_data, f, Dumper=SafeDumper)
+        return str(config_path)
 
     @pytest.mark.combo
     def test_config_loads_combo_mappings(self, basic_combo_config_data):
@@ -138,53 +139,47 @@ class TestConfigComboSupport:
         assert action.keys == ['KEY_CTRL', 'KEY_SHIFT', 'KEY_Z']
 
     @pytest.mark.combo
-    def test_invalid_combo_mappings_ignored_with_warnings(self, invalid_combo_config_data):
+    def test_invalid_combo_mappings_ignored_with_warnings(self, invalid_combo_config_data, caplog):
         """Test that invalid combo mappings are ignored with warnings."""
-        with patch('huion_keydial_mini.keybind_manager.logger') as mock_logger:
-            config = Config(invalid_combo_config_data)
-            manager = KeybindManager(config)
+        caplog.set_level(logging.WARNING, logger='huion_keydial_mini.keybind_manager')
+        config = Config(invalid_combo_config_data)
+        manager = KeybindManager(config)
 
-            # Verify valid mappings were loaded
-            assert manager.has_combo_mapping('BUTTON_1+BUTTON_2')
-            assert manager.get_action('BUTTON_1') is not None
+        # Verify valid mappings were loaded
+        assert manager.has_combo_mapping('BUTTON_1+BUTTON_2')
+        assert manager.get_action('BUTTON_1') is not None
 
-            # Verify invalid mappings were NOT loaded
-            assert not manager.has_combo_mapping('BUTTON_1+BUTTON_99')
-            assert manager.get_action('BUTTON_99') is None
-            assert manager.get_action('INVALID_ACTION') is None
+        # Verify invalid mappings were NOT loaded
+        assert not manager.has_combo_mapping('BUTTON_1+BUTTON_99')
+        assert manager.get_action('BUTTON_99') is None
+        assert manager.get_action('INVALID_ACTION') is None
 
-            # Verify warnings were logged for invalid entries
-            mock_logger.warning.assert_called()
-            warning_calls = [call.args[0] for call in mock_logger.warning.call_args_list]
+        # Verify warnings were logged for invalid entries
+        warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+        assert warnings
 
-            # Should have warnings about invalid entries
-            invalid_warnings = [w for w in warning_calls if 'Invalid' in w or 'invalid' in w]
-            assert len(invalid_warnings) > 0
+        # Should have warnings about invalid entries
+        invalid_warnings = [w for w in warnings if 'Invalid' in w or 'invalid' in w]
+        assert len(invalid_warnings) > 0
 
     @pytest.mark.combo
-    def test_combo_normalization_in_config(self, unsorted_combo_config_data):
+    @pytest.mark.parametrize("original,normalized", [
+        ('BUTTON_3+BUTTON_1', 'BUTTON_1+BUTTON_3'),
+        ('BUTTON_2+BUTTON_1+BUTTON_3', 'BUTTON_1+BUTTON_2+BUTTON_3'),
+        ('BUTTON_18+BUTTON_1+BUTTON_10', 'BUTTON_1+BUTTON_10+BUTTON_18'),
+        ('BUTTON_5+BUTTON_2', 'BUTTON_2+BUTTON_5'),
+    ])
+    def test_combo_normalization_in_config(self, unsorted_manager, original, normalized):
         """Test that combo mappings from config are normalized to sorted order."""
-        config = Config(unsorted_combo_config_data)
-        manager = KeybindManager(config)
-
-        # These should be normalized to sorted order
-        expected_normalizations = [
-            ('BUTTON_3+BUTTON_1', 'BUTTON_1+BUTTON_3'),
-            ('BUTTON_2+BUTTON_1+BUTTON_3', 'BUTTON_1+BUTTON_2+BUTTON_3'),
-            ('BUTTON_18+BUTTON_1+BUTTON_10', 'BUTTON_1+BUTTON_10+BUTTON_18'),
-            ('BUTTON_5+BUTTON_2', 'BUTTON_2+BUTTON_5'),
-        ]
-
-        for original, normalized in expected_normalizations:
-            # Original unsorted combo should NOT exist
-            assert not manager.has_combo_mapping(original)
+        # Original unsorted combo should NOT exist
+        assert not unsorted_manager.has_combo_mapping(original)
 
-            # Normalized combo SHOULD exist
-            assert manager.has_combo_mapping(normalized), f"Normalized combo {normalized} not found"
+        # Normalized combo SHOULD exist
+        assert unsorted_manager.has_combo_mapping(normalized), f"Normalized combo {normalized} not found"
 
-            # Verify the mapping
-            action = manager.get_action(normalized)
-            assert action is not None
+        # Verify the mapping
+        action = unsorted_manager.get_action(normalized)
+        assert action is not None
 
     @pytest.mark.combo
     def test_config_file_loading_with_combos(self, temp_combo_config_file):
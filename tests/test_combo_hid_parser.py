@@ -1,39 +1,56 @@
 """Tests for button combo detection in HID parser."""
 
 import pytest
-from unittest.mock import Mock, patch
 
-from huion_keydial_mini.hid_parser import HIDParser, EventType, InputEvent
+from huion_keydial_mini.hid_parser import HIDParser, EventType
 from huion_keydial_mini.config import Config
 
 
-class ComboHIDTestData:
-    """Test data for combo functionality."""
+# Individual button presses (type 1 format - bytes 3-5)
+BUTTON_1_ONLY = bytes([0x00, 0x00, 0x00, 0x0e, 0x00, 0x00, 0x00, 0x00])  # Button 1 only
+BUTTON_2_ONLY = bytes([0x00, 0x00, 0x00, 0x0a, 0x00, 0x00, 0x00, 0x00])  # Button 2 only
+BUTTON_3_ONLY = bytes([0x00, 0x00, 0x00, 0x0f, 0x00, 0x00, 0x00, 0x00])  # Button 3 only
 
-    # Individual button presses (type 1 format - bytes 3-5)
-    BUTTON_1_ONLY = bytearray([0x00, 0x00, 0x00, 0x0e, 0x00, 0x00, 0x00, 0x00])  # Button 1 only
-    BUTTON_2_ONLY = bytearray([0x00, 0x00, 0x00, 0x0a, 0x00, 0x00, 0x00, 0x00])  # Button 2 only
-    BUTTON_3_ONLY = bytearray([0x00, 0x00, 0x00, 0x0f, 0x00, 0x00, 0x00, 0x00])  # Button 3 only
+# Two-button combinations
+BUTTON_1_2 = bytes([0x00, 0x00, 0x00, 0x0e, 0x0a, 0x00, 0x00, 0x00])     # Buttons 1+2
+BUTTON_1_3 = bytes([0x00, 0x00, 0x00, 0x0e, 0x0f, 0x00, 0x00, 0x00])     # Buttons 1+3
+BUTTON_2_3 = bytes([0x00, 0x00, 0x00, 0x0a, 0x0f, 0x00, 0x00, 0x00])     # Buttons 2+3
 
-    # Two-button combinations
-    BUTTON_1_2 = bytearray([0x00, 0x00, 0x00, 0x0e, 0x0a, 0x00, 0x00, 0x00])     # Buttons 1+2
-    BUTTON_1_3 = bytearray([0x00, 0x00, 0x00, 0x0e, 0x0f, 0x00, 0x00, 0x00])     # Buttons 1+3
-    BUTTON_2_3 = bytearray([0x00, 0x00, 0x00, 0x0a, 0x0f, 0x00, 0x00, 0x00])     # Buttons 2+3
+# Three-button combinations
+BUTTON_1_2_3 = bytes([0x00, 0x00, 0x00, 0x0e, 0x0a, 0x0f, 0x00, 0x00])  # Buttons 1+2+3
 
-    # Three-button combinations
-    BUTTON_1_2_3 = bytearray([0x00, 0x00, 0x00, 0x0e, 0x0a, 0x0f, 0x00, 0x00])  # Buttons 1+2+3
+# No buttons pressed
+NO_BUTTONS = bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
 
-    # No buttons pressed
-    NO_BUTTONS = bytearray([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
+# Expected peak button sets
+NO_PEAK = frozenset()
+PEAK_1 = frozenset({'BUTTON_1'})
+PEAK_1_2 = frozenset({'BUTTON_1', 'BUTTON_2'})
+PEAK_1_3 = frozenset({'BUTTON_1', 'BUTTON_3'})
+PEAK_1_2_3 = frozenset({'BUTTON_1', 'BUTTON_2', 'BUTTON_3'})
 
 
-@pytest.fixture
-def combo_test_data():
-    """Provide combo test data."""
-    return ComboHIDTestData()
+def feed(parser, *reports):
+    """Feed reports to the parser in order and return the events from each."""
+    return [parser._parse_button_events(report) for report in reports]
 
 
-@pytest.fixture
+def drive(parser, steps):
+    """Feed (report, expected) steps to the parser, checking each step's events.
+
+    expected is a list of (event_type, key_code) pairs, or None to skip the
+    check for that step. Returns the events from each step.
+    """
+    results = []
+    for step, (report, expected) in enumerate(steps):
+        events = parser._parse_button_events(report)
+        if expected is not None:
+            assert [(e.event_type, e.key_code) for e in events] == expected, f"step {step}"
+        results.append(events)
+    return results
+
+
+@pytest.fixture(scope="module")
 def combo_config():
     """Create a config with combo mappings."""
     return Config({
@@ -56,7 +73,10 @@ def combo_config():
 
 @pytest.fixture
 def combo_parser(combo_config):
-    """Create a HIDParser with combo support."""
+    """Create a HIDParser with combo support.
+
+    Function scoped so each test starts with no combo session in progress.
+    """
     return HIDParser(combo_config)
 
 
@@ -66,70 +86,62 @@ class TestComboHIDParser:
     @pytest.mark.combo
     def test_combo_parser_initialization(self, combo_parser):
         """Test combo parser initialization."""
-        assert combo_parser.peak_buttons_this_session == set()
+        assert combo_parser.peak_buttons_this_session == NO_PEAK
         assert combo_parser.key_event_triggered is False
         assert combo_parser.previous_state == {}
 
     @pytest.mark.combo
-    def test_single_button_press_release(self, combo_parser, combo_test_data):
+    def test_single_button_press_release(self, combo_parser):
         """Test individual button press/release generates correct events."""
         # Press button 1
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
+        events = combo_parser._parse_button_events(BUTTON_1_ONLY)
         assert events == []  # No events on press
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1'}
+        assert combo_parser.peak_buttons_this_session == PEAK_1
         assert combo_parser.key_event_triggered is False
 
         # Release button 1
-        events = combo_parser._parse_button_events(combo_test_data.NO_BUTTONS)
+        events = combo_parser._parse_button_events(NO_BUTTONS)
         assert len(events) == 2  # Press + Release
         assert events[0].event_type == EventType.KEY_PRESS
         assert events[0].key_code == 'BUTTON_1'
         assert events[1].event_type == EventType.KEY_RELEASE
         assert events[1].key_code == 'BUTTON_1'
         assert combo_parser.key_event_triggered is True
-        assert combo_parser.peak_buttons_this_session == set()
+        assert combo_parser.peak_buttons_this_session == NO_PEAK
 
     @pytest.mark.combo
-    def test_two_button_combo_sequence(self, combo_parser, combo_test_data):
+    def test_two_button_combo_sequence(self, combo_parser):
         """Test two-button combo triggers correctly."""
-        # Press button 1
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        assert events == []
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1'}
-
-        # Press button 2 (while 1 held)
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        assert events == []
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_2'}
-        assert combo_parser.key_event_triggered is False
-
-        # Release button 1 (should trigger combo)
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_2_ONLY)
-        assert len(events) == 2  # Press + Release of combo
-        assert events[0].event_type == EventType.KEY_PRESS
-        assert events[0].key_code == 'BUTTON_1+BUTTON_2'
-        assert events[1].event_type == EventType.KEY_RELEASE
-        assert events[1].key_code == 'BUTTON_1+BUTTON_2'
+        drive(combo_parser, [
+            # Press button 1, then button 2 while 1 is held
+            (BUTTON_1_ONLY, []),
+            (BUTTON_1_2, []),
+            # Release button 1 (should trigger combo)
+            (BUTTON_2_ONLY, [
+                (EventType.KEY_PRESS, 'BUTTON_1+BUTTON_2'),
+                (EventType.KEY_RELEASE, 'BUTTON_1+BUTTON_2'),
+            ]),
+        ])
+        assert combo_parser.peak_buttons_this_session == PEAK_1_2
         assert combo_parser.key_event_triggered is True
 
-        # Release button 2 (should not trigger anything)
-        events = combo_parser._parse_button_events(combo_test_data.NO_BUTTONS)
-        assert events == []  # No events due to key_event_triggered flag
+        # Release button 2 (no events due to key_event_triggered flag)
+        drive(combo_parser, [(NO_BUTTONS, [])])
 
     @pytest.mark.combo
-    def test_three_button_combo_sequence(self, combo_parser, combo_test_data):
+    def test_three_button_combo_sequence(self, combo_parser):
         """Test three-button combo triggers correctly."""
         # Build up to three buttons
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2_3)
-
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_2', 'BUTTON_3'}
+        drive(combo_parser, [(BUTTON_1_ONLY, []), (BUTTON_1_2, []), (BUTTON_1_2_3, [])])
+        assert combo_parser.peak_buttons_this_session == PEAK_1_2_3
 
         # Release one button (should trigger 3-button combo)
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        assert len(events) == 2
-        assert events[0].key_code == 'BUTTON_1+BUTTON_2+BUTTON_3'
+        drive(combo_parser, [
+            (BUTTON_1_2, [
+                (EventType.KEY_PRESS, 'BUTTON_1+BUTTON_2+BUTTON_3'),
+                (EventType.KEY_RELEASE, 'BUTTON_1+BUTTON_2+BUTTON_3'),
+            ]),
+        ])
 
     @pytest.mark.combo
     def test_combo_id_generation(self, combo_parser):
@@ -147,91 +159,82 @@ class TestComboHIDParser:
         assert result == 'BUTTON_1'
 
     @pytest.mark.combo
-    def test_rapid_fire_combos(self, combo_parser, combo_test_data):
+    def test_rapid_fire_combos(self, combo_parser):
         """Test rapid-fire combo scenario (hold button 1, tap others)."""
-        # Press button 1
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
+        # Hold button 1, tap button 2, tap button 3, then release button 1
+        _, _, events_1_2, _, events_1_3, events_end = feed(
+            combo_parser,
+            BUTTON_1_ONLY, BUTTON_1_2, BUTTON_1_ONLY, BUTTON_1_3, BUTTON_1_ONLY, NO_BUTTONS,
+        )
 
-        # Press button 2, release button 2 (should trigger BUTTON_1+BUTTON_2)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        assert len(events) == 2
-        assert events[0].key_code == 'BUTTON_1+BUTTON_2'
+        # Releasing button 2 triggers BUTTON_1+BUTTON_2
+        assert len(events_1_2) == 2
+        assert events_1_2[0].key_code == 'BUTTON_1+BUTTON_2'
 
-        # Now press button 3, release button 3 (should trigger BUTTON_1+BUTTON_3)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_3)
-        events = combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        assert len(events) == 2
-        assert events[0].key_code == 'BUTTON_1+BUTTON_3'
+        # Releasing button 3 triggers BUTTON_1+BUTTON_3
+        assert len(events_1_3) == 2
+        assert events_1_3[0].key_code == 'BUTTON_1+BUTTON_3'
 
-        # Release button 1 (session ends, no more events)
-        events = combo_parser._parse_button_events(combo_test_data.NO_BUTTONS)
-        assert events == []
+        # Releasing button 1 ends the session with no more events
+        assert events_end == []
 
     @pytest.mark.combo
-    def test_key_event_triggered_reset_on_new_button(self, combo_parser, combo_test_data):
+    def test_key_event_triggered_reset_on_new_button(self, combo_parser):
         """Test that key_event_triggered resets when new buttons are pressed."""
         # Trigger a combo first
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_2_ONLY)  # Triggers combo
+        feed(combo_parser, BUTTON_1_ONLY, BUTTON_1_2, BUTTON_2_ONLY)
         assert combo_parser.key_event_triggered is True
 
         # Press a new button (should reset flag)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_2_3)
+        combo_parser._parse_button_events(BUTTON_2_3)
         assert combo_parser.key_event_triggered is False
 
     @pytest.mark.combo
-    def test_peak_button_tracking_with_different_combinations(self, combo_parser, combo_test_data):
+    def test_peak_button_tracking_with_different_combinations(self, combo_parser):
         """Test peak button tracking with various button combinations."""
         # Start with button 1
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1'}
+        combo_parser._parse_button_events(BUTTON_1_ONLY)
+        assert combo_parser.peak_buttons_this_session == PEAK_1
 
         # Add button 2 (new peak)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_2'}
+        combo_parser._parse_button_events(BUTTON_1_2)
+        assert combo_parser.peak_buttons_this_session == PEAK_1_2
 
         # Change to button 1+3 (different combination, same size)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_3)
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_3'}
+        combo_parser._parse_button_events(BUTTON_1_3)
+        assert combo_parser.peak_buttons_this_session == PEAK_1_3
 
         # Add button 2 back (new peak with 3 buttons)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2_3)
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_2', 'BUTTON_3'}
+        combo_parser._parse_button_events(BUTTON_1_2_3)
+        assert combo_parser.peak_buttons_this_session == PEAK_1_2_3
 
     @pytest.mark.combo
-    def test_session_reset_conditions(self, combo_parser, combo_test_data):
+    def test_session_reset_conditions(self, combo_parser):
         """Test when combo sessions reset correctly."""
-        # Build up a combo session
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        combo_parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)  # Trigger combo
+        # Build up a combo session and trigger the combo
+        feed(combo_parser, BUTTON_1_2, BUTTON_1_ONLY)
 
-        assert combo_parser.peak_buttons_this_session == {'BUTTON_1', 'BUTTON_2'}
+        assert combo_parser.peak_buttons_this_session == PEAK_1_2
         assert combo_parser.key_event_triggered is True
 
         # Release all buttons (should reset everything)
-        combo_parser._parse_button_events(combo_test_data.NO_BUTTONS)
-        assert combo_parser.peak_buttons_this_session == set()
+        combo_parser._parse_button_events(NO_BUTTONS)
+        assert combo_parser.peak_buttons_this_session == NO_PEAK
         assert combo_parser.key_event_triggered is False
 
     @pytest.mark.combo
-    def test_combo_normalization_consistency(self, combo_parser):
+    @pytest.mark.parametrize("combo", [
+        # Various orders of the same buttons; lists keep the order, unlike sets
+        ['BUTTON_1', 'BUTTON_2', 'BUTTON_3'],
+        ['BUTTON_3', 'BUTTON_1', 'BUTTON_2'],
+        ['BUTTON_2', 'BUTTON_3', 'BUTTON_1'],
+    ])
+    def test_combo_normalization_consistency(self, combo_parser, combo):
         """Test that combo ID normalization is consistent regardless of input order."""
-        # Test various orders of the same buttons
-        combinations = [
-            {'BUTTON_1', 'BUTTON_2', 'BUTTON_3'},
-            {'BUTTON_3', 'BUTTON_1', 'BUTTON_2'},
-            {'BUTTON_2', 'BUTTON_3', 'BUTTON_1'},
-        ]
-
-        expected = 'BUTTON_1+BUTTON_2+BUTTON_3'
-        for combo in combinations:
-            result = combo_parser._generate_combo_id(combo)
-            assert result == expected, f"Combo {combo} should normalize to {expected}, got {result}"
+        assert combo_parser._generate_combo_id(combo) == 'BUTTON_1+BUTTON_2+BUTTON_3'
 
     @pytest.mark.combo
-    def test_always_generates_events_for_valid_combos(self, combo_parser, combo_test_data):
+    def test_always_generates_events_for_valid_combos(self, combo_parser):
         """Test that HIDParser generates events for all valid combos.
 
         Even without config mappings, HIDParser should generate events and let
@@ -249,8 +252,8 @@ class TestComboHIDParser:
         parser = HIDParser(no_combo_config)
 
         # Try combo sequence
-        parser._parse_button_events(combo_test_data.BUTTON_1_2)
-        events = parser._parse_button_events(combo_test_data.BUTTON_1_ONLY)
+        parser._parse_button_events(BUTTON_1_2)
+        events = parser._parse_button_events(BUTTON_1_ONLY)
 
         # Should generate combo events even without config mapping
         # UInputHandler will handle actual mapping lookup from KeybindManager
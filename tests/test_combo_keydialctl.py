@@ -1,38 +1,85 @@
 """Tests for button combo handling in keydialctl CLI."""
 
+import json
 import pytest
 import asyncio
-import tempfile
-import os
-from unittest.mock import Mock, patch, AsyncMock
-from pathlib import Path
+from unittest.mock import AsyncMock
 
-from huion_keydial_mini.keybind_manager import send_command, KeybindManager
+from huion_keydial_mini.keybind_manager import (
+    send_command, send_commands, KeybindManager, _MAX_MESSAGE_SIZE
+)
 from huion_keydial_mini.config import Config
 
 
-class TestKeydialctlComboHandling:
-    """Test cases for keydialctl combo functionality."""
+# Combo IDs that validate; each normalizes to its sorted button list
+VALID_COMBOS = [
+    'BUTTON_1+BUTTON_2',
+    'BUTTON_1+BUTTON_3',
+    'BUTTON_2+BUTTON_3',
+    'BUTTON_1+BUTTON_2+BUTTON_3',
+    'BUTTON_10+BUTTON_18',  # Edge case with high numbers
+]
 
-    @pytest.fixture
-    def mock_socket_path(self):
-        """Mock socket path for testing."""
-        return "/tmp/test_keydial.sock"
 
-    @pytest.fixture
-    def combo_config(self):
-        """Create a test config with combo support."""
-        return Config({
-            'key_mappings': {
-                'BUTTON_1': 'KEY_F1',
-                'BUTTON_2': 'KEY_F2',
-                'BUTTON_1+BUTTON_2': 'KEY_CTRL+KEY_C',
-                'BUTTON_1+BUTTON_3': 'KEY_CTRL+KEY_V',
-                'BUTTON_2+BUTTON_3': 'KEY_CTRL+KEY_Z',
-            },
-            'dial_settings': {},
-            'debug_mode': True
-        })
+class _FakeReader:
+    """Stream reader stand-in that replies with one canned line."""
+
+    def __init__(self, line: bytes):
+        self.line = line
+
+    async def readline(self) -> bytes:
+        return self.line
+
+
+class _FakeWriter:
+    """Stream writer stand-in that records what was written."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def mock_socket_path():
+    """Mock socket path for testing."""
+    return "/tmp/test_keydial.sock"
+
+
+@pytest.fixture(scope="module")
+def combo_config():
+    """Create a test config with combo support."""
+    return Config({
+        'key_mappings': {
+            'BUTTON_1': 'KEY_F1',
+            'BUTTON_2': 'KEY_F2',
+            'BUTTON_1+BUTTON_2': 'KEY_CTRL+KEY_C',
+            'BUTTON_1+BUTTON_3': 'KEY_CTRL+KEY_V',
+            'BUTTON_2+BUTTON_3': 'KEY_CTRL+KEY_Z',
+        },
+        'dial_settings': {},
+        'debug_mode': True
+    })
+
+
+@pytest.fixture(scope="module")
+def ro_keybind_manager(combo_config):
+    """Keybind manager shared by tests that only query it, never bind."""
+    return KeybindManager(combo_config)
+
+
+class TestKeydialctlComboHandling:
+    """Test cases for keydialctl combo functionality."""
 
     @pytest.fixture
     def keybind_manager(self, combo_config):
@@ -41,89 +88,69 @@ class TestKeydialctlComboHandling:
 
     @pytest.mark.combo
     @pytest.mark.asyncio
-    async def test_send_combo_bind_command(self, mock_socket_path):
+    async def test_send_combo_bind_command(self, mock_socket_path, monkeypatch):
         """Test sending combo bind command via socket."""
-        # Mock the socket communication
-        mock_reader = AsyncMock()
-        mock_writer = AsyncMock()
-        mock_reader.readline.return_value = b'{"status": "success", "message": "Binding set"}\n'
-
-        with patch('huion_keydial_mini.keybind_manager.asyncio.open_unix_connection') as mock_connect:
-            mock_connect.return_value = (mock_reader, mock_writer)
+        # Fake the socket communication
+        reader = _FakeReader(b'{"status": "success", "message": "Binding set"}\n')
+        writer = _FakeWriter()
+        monkeypatch.setattr(asyncio, 'open_unix_connection', AsyncMock(return_value=(reader, writer)))
 
-            command = {
-                'command': 'set_binding',
-                'action_id': 'BUTTON_1+BUTTON_2',
-                'action': {
-                    'type': 'keyboard',
-                    'keys': ['KEY_CTRL', 'KEY_C'],
-                    'description': 'BUTTON_1+BUTTON_2 -> KEY_CTRL+KEY_C'
-                }
+        command = {
+            'command': 'set_binding',
+            'action_id': 'BUTTON_1+BUTTON_2',
+            'action': {
+                'type': 'keyboard',
+                'keys': ['KEY_CTRL', 'KEY_C'],
+                'description': 'BUTTON_1+BUTTON_2 -> KEY_CTRL+KEY_C'
             }
+        }
 
-            response = await send_command(mock_socket_path, command)
+        response = await send_command(mock_socket_path, command)
 
-            # Verify the command was sent correctly
-            mock_writer.write.assert_called_once()
-            written_data = mock_writer.write.call_args[0][0].decode('utf-8')
-            import json
-            sent_command = json.loads(written_data)
+        # Verify the command was sent correctly
+        assert len(writer.writes) == 1
+        written_data = writer.writes[0].decode('utf-8')
+        sent_command = json.loads(written_data)
 
-            assert sent_command['action_id'] == 'BUTTON_1+BUTTON_2'
-            assert sent_command['action']['keys'] == ['KEY_CTRL', 'KEY_C']
-            assert response['status'] == 'success'
+        assert sent_command['action_id'] == 'BUTTON_1+BUTTON_2'
+        assert sent_command['action']['keys'] == ['KEY_CTRL', 'KEY_C']
+        assert response['status'] == 'success'
 
     @pytest.mark.combo
-    def test_combo_id_validation_valid_combos(self, keybind_manager):
+    @pytest.mark.parametrize("combo_id,expected", [
+        (combo_id, '+'.join(sorted(combo_id.split('+')))) for combo_id in VALID_COMBOS
+    ])
+    def test_combo_id_validation_valid_combos(self, ro_keybind_manager, combo_id, expected):
         """Test validation of valid combo action IDs."""
-        valid_combos = [
-            'BUTTON_1+BUTTON_2',
-            'BUTTON_1+BUTTON_3',
-            'BUTTON_2+BUTTON_3',
-            'BUTTON_1+BUTTON_2+BUTTON_3',
-            'BUTTON_10+BUTTON_18',  # Edge case with high numbers
-        ]
-
-        for combo_id in valid_combos:
-            normalized = keybind_manager._validate_and_normalize_action_id(combo_id)
-            assert normalized is not None, f"Valid combo {combo_id} was rejected"
-
-            # Check normalization (should be sorted)
-            buttons = combo_id.split('+')
-            expected = '+'.join(sorted(buttons))
-            assert normalized == expected
+        assert ro_keybind_manager._validate_and_normalize_action_id(combo_id) == expected
 
     @pytest.mark.combo
-    def test_combo_id_validation_invalid_combos(self, keybind_manager):
+    @pytest.mark.parametrize("combo_id", [
+        'BUTTON_99',                    # Invalid button number
+        'BUTTON_1+BUTTON_99',          # Contains invalid button
+        'BUTTON_1+',                   # Incomplete combo
+        '+BUTTON_2',                   # Starts with separator
+        'BUTTON_1++BUTTON_2',          # Double separator
+        'BUTTON_1+BUTTON_1',           # Duplicate button
+        'INVALID_BUTTON',              # Not a button at all
+        '',                            # Empty string
+    ])
+    def test_combo_id_validation_invalid_combos(self, ro_keybind_manager, combo_id):
         """Test validation rejects invalid combo action IDs."""
-        invalid_combos = [
-            'BUTTON_99',                    # Invalid button number
-            'BUTTON_1+BUTTON_99',          # Contains invalid button
-            'BUTTON_1+',                   # Incomplete combo
-            '+BUTTON_2',                   # Starts with separator
-            'BUTTON_1++BUTTON_2',          # Double separator
-            'BUTTON_1+BUTTON_1',           # Duplicate button
-            'INVALID_BUTTON',              # Not a button at all
-            '',                            # Empty string
-        ]
-
-        for combo_id in invalid_combos:
-            normalized = keybind_manager._validate_and_normalize_action_id(combo_id)
-            assert normalized is None, f"Invalid combo {combo_id} was accepted"
+        normalized = ro_keybind_manager._validate_and_normalize_action_id(combo_id)
+        assert normalized is None, f"Invalid combo {combo_id} was accepted"
 
     @pytest.mark.combo
-    def test_combo_id_normalization_order(self, keybind_manager):
+    @pytest.mark.parametrize("input_combo,expected_combo", [
+        ('BUTTON_3+BUTTON_1', 'BUTTON_1+BUTTON_3'),
+        ('BUTTON_2+BUTTON_1+BUTTON_3', 'BUTTON_1+BUTTON_2+BUTTON_3'),
+        ('BUTTON_18+BUTTON_1+BUTTON_10', 'BUTTON_1+BUTTON_10+BUTTON_18'),
+        ('BUTTON_5+BUTTON_2+BUTTON_8+BUTTON_1', 'BUTTON_1+BUTTON_2+BUTTON_5+BUTTON_8'),
+    ])
+    def test_combo_id_normalization_order(self, ro_keybind_manager, input_combo, expected_combo):
         """Test that combo IDs are normalized to consistent order."""
-        test_cases = [
-            ('BUTTON_3+BUTTON_1', 'BUTTON_1+BUTTON_3'),
-            ('BUTTON_2+BUTTON_1+BUTTON_3', 'BUTTON_1+BUTTON_2+BUTTON_3'),
-            ('BUTTON_18+BUTTON_1+BUTTON_10', 'BUTTON_1+BUTTON_10+BUTTON_18'),
-            ('BUTTON_5+BUTTON_2+BUTTON_8+BUTTON_1', 'BUTTON_1+BUTTON_2+BUTTON_5+BUTTON_8'),
-        ]
-
-        for input_combo, expected_combo in test_cases:
-            normalized = keybind_manager._validate_and_normalize_action_id(input_combo)
-            assert normalized == expected_combo, f"'{input_combo}' should normalize to '{expected_combo}', got '{normalized}'"
+        normalized = ro_keybind_manager._validate_and_normalize_action_id(input_combo)
+        assert normalized == expected_combo
 
     @pytest.mark.combo
     def test_combo_action_creation(self, keybind_manager):
@@ -142,6 +169,15 @@ class TestKeydialctlComboHandling:
         assert action.keys == ['KEY_CTRL', 'KEY_C']
         assert action.description == 'Copy action'
 
+    @pytest.mark.combo
+    def test_combo_action_with_raw_key_codes(self, keybind_manager):
+        """Test combo actions can be bound to raw key codes."""
+        combo_id = keybind_manager.set_combo_action(['BUTTON_1', 'BUTTON_2'], [29, 46])
+
+        action = keybind_manager.get_action(combo_id)
+        assert action.keys == [29, 46]
+        assert action.description == 'Combo BUTTON_1+BUTTON_2 -> 29+46'
+
     @pytest.mark.combo
     def test_combo_vs_individual_mappings_separation(self, keybind_manager):
         """Test that combo and individual mappings are properly separated."""
@@ -166,23 +202,20 @@ class TestKeydialctlComboHandling:
         assert individual_keys.isdisjoint(combo_keys)
 
     @pytest.mark.combo
-    def test_is_combo_action_detection(self, keybind_manager):
+    @pytest.mark.parametrize("action_id,expected_is_combo", [
+        ('BUTTON_1', False),
+        ('BUTTON_18', False),
+        ('DIAL_CW', False),
+        ('BUTTON_1+BUTTON_2', True),
+        ('BUTTON_1+BUTTON_2+BUTTON_3', True),
+        ('BUTTON_10+BUTTON_15', True),
+    ])
+    def test_is_combo_action_detection(self, ro_keybind_manager, action_id, expected_is_combo):
         """Test detection of combo vs individual actions."""
-        test_cases = [
-            ('BUTTON_1', False),
-            ('BUTTON_18', False),
-            ('DIAL_CW', False),
-            ('BUTTON_1+BUTTON_2', True),
-            ('BUTTON_1+BUTTON_2+BUTTON_3', True),
-            ('BUTTON_10+BUTTON_15', True),
-        ]
-
-        for action_id, expected_is_combo in test_cases:
-            result = keybind_manager.is_combo_action(action_id)
-            assert result == expected_is_combo, f"'{action_id}' combo detection failed"
+        assert ro_keybind_manager.is_combo_action(action_id) == expected_is_combo
 
     @pytest.mark.combo
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_combo_bind_command_processing(self, keybind_manager):
         """Test processing combo bind commands through the manager."""
         # Simulate a bind command for a combo
@@ -208,6 +241,181 @@ class TestKeydialctlComboHandling:
 
     @pytest.mark.combo
     @pytest.mark.asyncio
+    async def test_combo_bind_many_command_processing(self, keybind_manager):
+        """Test processing a batched bind command through the manager."""
+        command = {
+            'command': 'set_bindings',
+            'items': [
+                {
+                    'action_id': 'BUTTON_1+BUTTON_2',
+                    'action': {'type': 'keyboard', 'keys': ['KEY_CTRL', 'KEY_C']}
+                },
+                {
+                    'action_id': 'DIAL_CW',
+                    'action': {'type': 'keyboard', 'keys': ['KEY_VOLUMEUP']}
+                },
+            ]
+        }
+
+        response = await keybind_manager._process_command(command)
+
+        assert response['status'] == 'success'
+        assert keybind_manager.get_action('BUTTON_1+BUTTON_2').keys == ['KEY_CTRL', 'KEY_C']
+        assert keybind_manager.get_action('DIAL_CW').keys == ['KEY_VOLUMEUP']
+
+        # An invalid entry rejects the whole batch
+        command['items'].append({'action_id': 'BUTTON_3', 'action': {'type': 'mouse'}})
+        response = await keybind_manager._process_command(command)
+
+        assert response['status'] == 'error'
+        assert keybind_manager.get_action('BUTTON_3') is None
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_combo_bind_many_normalizes_action_ids(self, keybind_manager):
+        """Test batched combo IDs are stored in sorted order."""
+        response = await keybind_manager._process_command({
+            'command': 'set_bindings',
+            'items': [{
+                'action_id': 'BUTTON_3+BUTTON_1',
+                'action': {'type': 'keyboard', 'keys': ['KEY_ALT', 'KEY_TAB']}
+            }]
+        })
+
+        assert response['status'] == 'success'
+        assert keybind_manager.has_combo_mapping('BUTTON_1+BUTTON_3')
+        assert not keybind_manager.has_combo_mapping('BUTTON_3+BUTTON_1')
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("bad_item", [
+        'BUTTON_3',                                                         # Not a dict
+        {'action_id': 'BUTTON_99', 'action': {'type': 'keyboard', 'keys': ['KEY_A']}},  # Unknown button
+        {'action_id': 42, 'action': {'type': 'keyboard', 'keys': ['KEY_A']}},           # Non-string ID
+    ])
+    async def test_combo_bind_many_rejects_bad_items(self, keybind_manager, bad_item):
+        """Test a malformed item rejects the whole batch without changing bindings."""
+        before = dict(keybind_manager.get_all_actions())
+        response = await keybind_manager._process_command({
+            'command': 'set_bindings',
+            'items': [
+                {'action_id': 'BUTTON_3', 'action': {'type': 'keyboard', 'keys': ['KEY_F3']}},
+                bad_item,
+            ]
+        })
+
+        assert response['status'] == 'error'
+        assert keybind_manager.get_all_actions() == before
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_send_commands_over_one_connection(self, combo_config, tmp_path):
+        """Test several commands sharing one socket connection."""
+        manager = KeybindManager(combo_config, socket_path=str(tmp_path / 'keydial.sock'))
+        await manager.start_socket_server()
+        try:
+            responses = await send_commands(manager.socket_path, [
+                {'command': 'clear_all'},
+                {
+                    'command': 'set_binding',
+                    'action_id': 'BUTTON_1+BUTTON_2',
+                    'action': {'type': 'keyboard', 'keys': ['KEY_CTRL', 'KEY_C']}
+                },
+                {'command': 'bogus'},
+            ])
+        finally:
+            await manager.stop_socket_server()
+
+        assert [r['status'] for r in responses] == ['success', 'success', 'error']
+        assert manager.get_action('BUTTON_1+BUTTON_2').keys == ['KEY_CTRL', 'KEY_C']
+        assert manager.get_action('BUTTON_1') is None
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_newline_less_command_gets_reply(self, combo_config, tmp_path):
+        """Test an older client's single command without a newline is answered on an open connection."""
+        manager = KeybindManager(combo_config, socket_path=str(tmp_path / 'keydial.sock'))
+        await manager.start_socket_server()
+        try:
+            reader, writer = await asyncio.open_unix_connection(manager.socket_path)
+            # What send_command wrote before commands were newline-delimited
+            writer.write(json.dumps({'command': 'get_bindings'}).encode('utf-8'))
+            await writer.drain()
+
+            response = json.loads(await asyncio.wait_for(reader.readline(), 5.0))
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await manager.stop_socket_server()
+
+        assert response['status'] == 'success'
+        assert 'bindings' in response
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_send_commands_times_out_on_single_reply_daemon(self, tmp_path, monkeypatch):
+        """Test a daemon that answers only the first command can't hang send_commands."""
+        monkeypatch.setattr('huion_keydial_mini.keybind_manager._RESPONSE_TIMEOUT', 0.1)
+
+        async def old_daemon(reader, writer):
+            # Older daemons read once, answer once and leave the connection open
+            await reader.read(1024)
+            writer.write(b'{"status": "success"}\n')
+            await writer.drain()
+
+        socket_path = str(tmp_path / 'old.sock')
+        server = await asyncio.start_unix_server(old_daemon, path=socket_path)
+        try:
+            responses = await send_commands(socket_path, [{'command': 'clear_all'}, {'command': 'list_actions'}])
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        assert responses[0]['status'] == 'success'
+        assert responses[1]['status'] == 'error'
+        assert 'Timed out' in responses[1]['message']
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_large_command_within_limit(self, combo_config, tmp_path):
+        """Test a command line larger than asyncio's 64 KiB default is accepted."""
+        manager = KeybindManager(combo_config, socket_path=str(tmp_path / 'keydial.sock'))
+        await manager.start_socket_server()
+        try:
+            response = await send_command(manager.socket_path, {
+                'command': 'set_binding',
+                'action_id': 'BUTTON_1',
+                'action': {'type': 'keyboard', 'keys': ['KEY_F1'], 'description': 'x' * 100_000},
+            })
+        finally:
+            await manager.stop_socket_server()
+
+        assert response['status'] == 'success'
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio
+    async def test_oversized_command_rejected(self, combo_config, tmp_path):
+        """Test a command over the size limit gets an error and the connection is closed."""
+        manager = KeybindManager(combo_config, socket_path=str(tmp_path / 'keydial.sock'))
+        await manager.start_socket_server()
+        try:
+            reader, writer = await asyncio.open_unix_connection(manager.socket_path)
+            writer.write(b'{"command": "' + b'x' * (_MAX_MESSAGE_SIZE + 1) + b'"}\n')
+            await writer.drain()
+
+            response = json.loads(await reader.readline())
+            # The server hangs up after the error
+            assert await reader.readline() == b''
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await manager.stop_socket_server()
+
+        assert response['status'] == 'error'
+        assert 'too long' in response['message']
+
+    @pytest.mark.combo
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_combo_unbind_command_processing(self, keybind_manager):
         """Test processing combo unbind commands through the manager."""
         # First create a combo binding
@@ -229,7 +437,7 @@ class TestKeydialctlComboHandling:
         assert not keybind_manager.has_combo_mapping('BUTTON_1+BUTTON_2')
 
     @pytest.mark.combo
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_get_bindings_includes_combos(self, keybind_manager):
         """Test that get_bindings command includes combo mappings."""
         # Add a combo mapping
@@ -249,20 +457,59 @@ class TestKeydialctlComboHandling:
         assert combo_binding['keys'] == ['KEY_CTRL', 'KEY_C']
 
     @pytest.mark.combo
-    def test_combo_button_edge_cases(self, keybind_manager):
+    def test_combo_button_edge_cases(self, ro_keybind_manager):
         """Test edge cases in combo button handling."""
         # Test with maximum button numbers
-        valid_high_combo = keybind_manager._validate_and_normalize_action_id('BUTTON_18+BUTTON_17')
+        valid_high_combo = ro_keybind_manager._validate_and_normalize_action_id('BUTTON_18+BUTTON_17')
         assert valid_high_combo == 'BUTTON_17+BUTTON_18'
 
         # Test with minimum button numbers
-        valid_low_combo = keybind_manager._validate_and_normalize_action_id('BUTTON_2+BUTTON_1')
+        valid_low_combo = ro_keybind_manager._validate_and_normalize_action_id('BUTTON_2+BUTTON_1')
         assert valid_low_combo == 'BUTTON_1+BUTTON_2'
 
         # Test single button (should work for individual buttons)
-        single_button = keybind_manager._validate_and_normalize_action_id('BUTTON_1')
+        single_button = ro_keybind_manager._validate_and_normalize_action_id('BUTTON_1')
         assert single_button == 'BUTTON_1'
 
         # Test empty combo (should fail)
-        empty_combo = keybind_manager._validate_and_normalize_action_id('+')
+        empty_combo = ro_keybind_manager._validate_and_normalize_action_id('+')
         assert empty_combo is None
+
+
+class TestKeydialctlListKeys:
+    """Tests for the list-keys command."""
+
+    @pytest.fixture
+    def list_keys_output(self, monkeypatch):
+        """Run list-keys over a fixed set of key names and return its output."""
+        import sys
+        import types
+        from click.testing import CliRunner
+        from huion_keydial_mini.keydialctl import cli
+
+        # list-keys imports uinput_handler lazily; give it known names
+        # without needing evdev
+        names = ('KEY_F', 'KEY_F1', 'KEY_F12', 'KEY_FORWARD', 'KEY_FASTFORWARD', 'KEY_A', 'KEY_1')
+        fake_module = types.ModuleType('huion_keydial_mini.uinput_handler')
+        fake_module.supported_key_names = lambda: names
+        monkeypatch.setitem(sys.modules, 'huion_keydial_mini.uinput_handler', fake_module)
+
+        result = CliRunner().invoke(cli, ['list-keys'])
+        assert result.exit_code == 0
+        return result.output
+
+    @staticmethod
+    def _group(output, title):
+        """Get the keys listed under one group heading."""
+        section = output.split(f"{title}:\n", 1)[1].split("\n\n", 1)[0]
+        return [line.strip() for line in section.splitlines()]
+
+    @pytest.mark.unit
+    def test_function_keys_are_numbered_f_keys(self, list_keys_output):
+        """Test only KEY_F<number> is listed as a function key."""
+        assert self._group(list_keys_output, "Function keys") == ['KEY_F1', 'KEY_F12']
+
+    @pytest.mark.unit
+    def test_key_f_is_a_letter(self, list_keys_output):
+        """Test KEY_F is listed with the other letters."""
+        assert self._group(list_keys_output, "Letter keys") == ['KEY_A', 'KEY_F']
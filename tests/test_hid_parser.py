@@ -1,12 +1,17 @@
 """Tests for the HID parser functionality."""
 
 import pytest
-from unittest.mock import Mock, patch
 
 from huion_keydial_mini.hid_parser import HIDParser, EventType, InputEvent
 from huion_keydial_mini.config import Config
 
 
+# Dial format: f1[clicked][count][direction]0000000000
+# For rotation: clicked=0x00, direction: 0x00=clockwise, 0xff=counter-clockwise
+DIAL_CW_DELTA_2 = bytes([0xf1, 0x00, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Delta of 2
+DIAL_CW_DELTA_10 = bytes([0xf1, 0x00, 0x0A, 0x00, 0x00, 0x00, 0x00, 0x00])  # 10 steps clockwise rotation
+
+
 class TestHIDParser:
     """Test cases for HIDParser class."""
 
@@ -62,8 +67,10 @@ class TestHIDParser:
         assert len(events) == 2
         assert events[0].event_type == EventType.KEY_PRESS
         assert events[0].key_code == "BUTTON_13"
+        assert events[0].is_press
         assert events[1].event_type == EventType.KEY_RELEASE
         assert events[1].key_code == "BUTTON_13"
+        assert not events[1].is_press
 
     @pytest.mark.hid_parser
     def test_parse_multiple_buttons(self, hid_parser, hid_test_data):
@@ -84,63 +91,24 @@ class TestHIDParser:
         assert events[0].key_code == events[1].key_code
 
     @pytest.mark.hid_parser
-    def test_parse_dial_clockwise(self, hid_parser, hid_test_data):
-        """Test parsing dial clockwise rotation."""
-        events = hid_parser.parse(hid_test_data.DIAL_CW)
-
-        assert len(events) == 2  # Press and release
-        press_event = events[0]
-        release_event = events[1]
-
-        assert press_event.event_type == EventType.KEY_PRESS
-        assert press_event.key_code == "DIAL_CW"
-        assert press_event.direction == 1
-        assert press_event.value == 1
-
-        assert release_event.event_type == EventType.KEY_RELEASE
-        assert release_event.key_code == "DIAL_CW"
-
-    @pytest.mark.hid_parser
-    def test_parse_dial_counterclockwise(self, hid_parser, hid_test_data):
-        """Test parsing dial counter-clockwise rotation."""
-        events = hid_parser.parse(hid_test_data.DIAL_CCW)
-
-        assert len(events) == 2  # Press and release
-        press_event = events[0]
-        release_event = events[1]
-
-        assert press_event.event_type == EventType.KEY_PRESS
-        assert press_event.key_code == "DIAL_CCW"
-        assert press_event.direction == -1
-        assert press_event.value == 1
-
-        assert release_event.event_type == EventType.KEY_RELEASE
-        assert release_event.key_code == "DIAL_CCW"
-
-    @pytest.mark.hid_parser
-    def test_parse_dial_click(self, hid_parser, hid_test_data):
-        """Test parsing dial click."""
-        events = hid_parser.parse(hid_test_data.DIAL_CLICK)
-
-        assert len(events) == 1  # Only press event for click
-        press_event = events[0]
-
-        assert press_event.event_type == EventType.KEY_PRESS
-        assert press_event.key_code == "DIAL_CLICK"
-
-    @pytest.mark.hid_parser
-    def test_parse_dial_click_release(self, hid_parser, hid_test_data):
-        """Test parsing dial click release."""
-        # First click
-        hid_parser.parse(hid_test_data.DIAL_CLICK)
-
-        # Then release
-        events = hid_parser.parse(hid_test_data.DIAL_CLICK_RELEASE)
-
-        assert len(events) == 1
-        event = events[0]
-        assert event.event_type == EventType.KEY_RELEASE
-        assert event.key_code == "DIAL_CLICK"
+    @pytest.mark.parametrize("reports,key_code,event_types,direction", [
+        (("DIAL_CW",), "DIAL_CW", [EventType.KEY_PRESS, EventType.KEY_RELEASE], 1),
+        (("DIAL_CCW",), "DIAL_CCW", [EventType.KEY_PRESS, EventType.KEY_RELEASE], -1),
+        # Only a press event for click; the release comes with the next report
+        (("DIAL_CLICK",), "DIAL_CLICK", [EventType.KEY_PRESS], None),
+        (("DIAL_CLICK", "DIAL_CLICK_RELEASE"), "DIAL_CLICK", [EventType.KEY_RELEASE], None),
+    ], ids=["clockwise", "counterclockwise", "click", "click_release"])
+    def test_parse_dial(self, hid_parser, hid_test_data, reports, key_code, event_types, direction):
+        """Test parsing dial rotation, click and click release."""
+        for report in reports:
+            events = hid_parser.parse(getattr(hid_test_data, report))
+
+        assert [event.event_type for event in events] == event_types
+        assert all(event.key_code == key_code for event in events)
+
+        # Rotation reports one step in its direction; clicks carry neither
+        assert events[0].direction == direction
+        assert events[0].value == (1 if direction else None)
 
     @pytest.mark.hid_parser
     def test_parse_type1_buttons(self, hid_parser, hid_test_data):
@@ -182,8 +150,7 @@ class TestHIDParser:
         parser = HIDParser(config)
 
         # Test dial rotation with higher sensitivity
-        dial_data = bytearray([0xf1, 0x00, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # Delta of 2
-        events = parser.parse(dial_data)
+        events = parser.parse(DIAL_CW_DELTA_2)
 
         # With sensitivity 2.0, delta 2 should generate 4 steps (2 * 2 = 4)
         assert len(events) == 8  # 4 press/release pairs
@@ -222,10 +189,15 @@ class TestHIDParser:
         # Press button to set state
         hid_parser.parse(hid_test_data.BUTTON_13_PRESS)
         assert hid_parser.previous_state != {}
+        assert hid_parser.peak_buttons_this_session == {'BUTTON_13'}
 
         # Reset state
         hid_parser.reset_state()
         assert hid_parser.previous_state == {}
+        assert hid_parser.peak_buttons_this_session == set()
+
+        # The abandoned press doesn't leak into the next report
+        assert hid_parser.parse(hid_test_data.BUTTON_RELEASE) == []
 
     @pytest.mark.hid_parser
     def test_get_debug_info(self, hid_parser):
@@ -238,17 +210,17 @@ class TestHIDParser:
         assert debug_info['debug_mode'] is True
 
     @pytest.mark.hid_parser
-    def test_parse_exception_handling(self, hid_parser, mock_logger):
+    def test_parse_exception_handling(self, hid_parser, hid_test_data, mock_logger):
         """Test exception handling during parsing."""
         # Test with data that might cause issues
-        events = hid_parser.parse(bytearray([0xf1, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]))
+        events = hid_parser.parse(hid_test_data.DIAL_CW)
 
         # Should handle gracefully and return events
         assert isinstance(events, list)
         assert len(events) == 2  # Press and release
 
     @pytest.mark.hid_parser
-    def test_parse_with_missing_key_mappings(self, sample_config_data):
+    def test_parse_with_missing_key_mappings(self, sample_config_data, hid_test_data):
         """Test parsing with missing key mappings using combo system."""
         # Remove key mappings to test behavior
         del sample_config_data['key_mappings']
@@ -256,11 +228,11 @@ class TestHIDParser:
         parser = HIDParser(config)
 
         # Test button press (no immediate events in combo system)
-        press_events = parser.parse(bytearray([0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]))
+        press_events = parser.parse(hid_test_data.BUTTON_13_PRESS)
         assert len(press_events) == 0
 
         # Test button release (generates combo events)
-        events = parser.parse(bytearray([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]))
+        events = parser.parse(hid_test_data.BUTTON_RELEASE)
         assert len(events) == 2
         assert events[0].event_type == EventType.KEY_PRESS
         assert events[0].key_code == "BUTTON_13"
@@ -271,10 +243,7 @@ class TestHIDParser:
     def test_parse_dial_with_large_delta(self, hid_parser):
         """Test parsing dial rotation with large delta values."""
         # Test with a moderate delta value
-        # Dial format: f1[clicked][count][direction]0000000000
-        # For rotation: clicked=0x00, direction: 0x00=clockwise, 0xff=counter-clockwise
-        large_delta_data = bytearray([0xf1, 0x00, 0x0A, 0x00, 0x00, 0x00, 0x00, 0x00])  # 10 steps clockwise rotation
-        events = hid_parser.parse(large_delta_data)
+        events = hid_parser.parse(DIAL_CW_DELTA_10)
 
         # Should generate events - 10 steps * 2 events per step = 20 events
         assert len(events) > 0
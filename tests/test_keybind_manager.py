@@ -2,7 +2,7 @@
 
 import pytest
 
-from huion_keydial_mini.keybind_manager import KeybindManager
+from huion_keydial_mini.keybind_manager import KEY_CODE_MAX, KeybindAction, KeybindManager, NullKeybindManager
 from huion_keydial_mini.config import Config
 
 
@@ -35,3 +35,37 @@ class TestKeybindManager:
         assert keybind_manager.keybind_map['BUTTON_2'].keys == ['KEY_F2']
         assert keybind_manager.keybind_map['BUTTON_1'].sticky is False
         assert keybind_manager.keybind_map['BUTTON_2'].sticky is True
+
+    @pytest.mark.keybind_manager
+    def test_null_keybind_manager_has_no_actions(self):
+        """Test the null keybind manager never returns a binding."""
+        null_manager = NullKeybindManager()
+        assert null_manager.get_action('BUTTON_1') is None
+        assert null_manager.get_all_actions() == {}
+
+    @pytest.mark.keybind_manager
+    @pytest.mark.parametrize("key", [70000, -1, 0, True, 1.5, None])
+    def test_keybind_action_rejects_invalid_key_codes(self, key):
+        """Test raw key codes uinput can't send are rejected."""
+        with pytest.raises(ValueError):
+            KeybindAction.from_dict({'type': 'keyboard', 'keys': ['KEY_LEFTCTRL', key]})
+
+    @pytest.mark.keybind_manager
+    def test_keybind_action_accepts_key_codes(self):
+        """Test key names and in-range raw key codes are accepted."""
+        action = KeybindAction.from_dict({'type': 'keyboard', 'keys': ['KEY_LEFTCTRL', 30, KEY_CODE_MAX]})
+        assert action.keys == ['KEY_LEFTCTRL', 30, KEY_CODE_MAX]
+
+    @pytest.mark.keybind_manager
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command", ['set_binding', 'set_bindings'])
+    @pytest.mark.parametrize("key", [70000, -1, 0, True])
+    async def test_set_binding_commands_reject_invalid_key_codes(self, keybind_manager, command, key):
+        """Test both binding commands answer an invalid key code with an error."""
+        item = {'action_id': 'BUTTON_3', 'action': {'type': 'keyboard', 'keys': [key]}}
+        request = {'command': command, **item} if command == 'set_binding' else {'command': command, 'items': [item]}
+
+        response = await keybind_manager._process_command(request)
+
+        assert response['status'] == 'error'
+        assert keybind_manager.get_action('BUTTON_3') is None
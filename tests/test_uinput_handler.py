@@ -0,0 +1,275 @@
+"""Tests for the uinput handler's device lifecycle and event output."""
+
+import asyncio
+import errno
+import types
+
+import pytest
+
+pytest.importorskip("evdev")
+
+from evdev import ecodes  # noqa: E402
+
+from huion_keydial_mini import uinput_handler  # noqa: E402
+from huion_keydial_mini.config import Config  # noqa: E402
+from huion_keydial_mini.hid_parser import EventType as HIDEventType, InputEvent  # noqa: E402
+from huion_keydial_mini.keybind_manager import EventType, KeybindAction, KeybindManager  # noqa: E402
+from huion_keydial_mini.uinput_handler import KEY_MAPPING, UInputHandler, _EV_KEY, _INPUT_EVENT  # noqa: E402
+
+
+class FakeUInput:
+    """Stands in for evdev.UInput, recording what each device was opened with."""
+
+    # Set by a test to make the next N opens fail with ENOMEM unless only a
+    # single key is requested
+    enomem_failures = 0
+    # Set by a test to make every open fail as if /dev/uinput were missing
+    unavailable = False
+    opened = []
+
+    def __init__(self, events=None, name=None):
+        if FakeUInput.unavailable:
+            raise OSError(errno.ENOENT, "No such file or directory")
+        key_codes = list(events[_EV_KEY])
+        if FakeUInput.enomem_failures and len(key_codes) > 1:
+            FakeUInput.enomem_failures -= 1
+            raise OSError(errno.ENOMEM, "Cannot allocate memory")
+        self.key_codes = key_codes
+        self.name = name
+        # No raw fd, so writes go through write() and can be recorded
+        self.fd = None
+        self.written = []
+        self.closed = False
+        FakeUInput.opened.append(self)
+
+    def write(self, event_type, code, value):
+        self.written.append((event_type, code, value))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_uinput(monkeypatch):
+    """Replace UInput with FakeUInput for the duration of a test."""
+    FakeUInput.enomem_failures = 0
+    FakeUInput.unavailable = False
+    FakeUInput.opened = []
+    monkeypatch.setattr(uinput_handler, 'UInput', FakeUInput)
+    return FakeUInput
+
+
+@pytest.fixture
+def keybind_manager():
+    """Create a keybind manager with one binding."""
+    return KeybindManager(config=Config({'key_mappings': {'BUTTON_1': 'KEY_F1'}}))
+
+
+def _manager_with(action_id, keys):
+    """Create a keybind manager with one extra binding."""
+    manager = KeybindManager(config=Config({'key_mappings': {'BUTTON_1': 'KEY_F1'}}))
+    manager.set_action(action_id, KeybindAction(type=EventType.KEYBOARD, keys=keys))
+    return manager
+
+
+def _unmapped_code():
+    """Get a valid key code that isn't in KEY_MAPPING."""
+    known = set(KEY_MAPPING.values())
+    return next(code for code in range(1, ecodes.KEY_MAX) if code not in known)
+
+
+@pytest.fixture
+def handler(config, keybind_manager):
+    """Create a uinput handler whose device has not been opened yet."""
+    return UInputHandler(config, keybind_manager)
+
+
+class TestUInputHandlerDevice:
+    """Tests for opening and reopening the virtual device."""
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_start_advertises_all_keys(self, handler, fake_uinput):
+        """Test the device is opened with every supported key."""
+        await handler.start()
+
+        assert len(fake_uinput.opened) == 1
+        assert set(fake_uinput.opened[0].key_codes) >= set(KEY_MAPPING.values())
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_enomem_narrows_only_the_current_device(self, handler, fake_uinput):
+        """Test an ENOMEM fallback doesn't stick to the next device."""
+        fake_uinput.enomem_failures = 1
+        await handler.start()
+
+        # The kernel refused the full set, so only the bound key is advertised
+        assert fake_uinput.opened[0].key_codes == [KEY_MAPPING['KEY_F1']]
+
+        await handler.stop()
+        await handler.start()
+
+        # The next open asks for the full set again
+        assert set(fake_uinput.opened[1].key_codes) >= set(KEY_MAPPING.values())
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_set_keybind_manager_keeps_device_for_known_keys(self, handler, fake_uinput):
+        """Test bindings to advertised keys don't reopen the device."""
+        await handler.start()
+        device = handler.device
+
+        await handler.set_keybind_manager(_manager_with('BUTTON_2', ['KEY_F2']))
+
+        assert handler.device is device
+        assert not device.closed
+        assert len(fake_uinput.opened) == 1
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_set_keybind_manager_reopens_for_new_codes(self, handler, fake_uinput):
+        """Test a binding to a code the device doesn't advertise reopens it."""
+        await handler.start()
+        device = handler.device
+        extra_code = _unmapped_code()
+
+        await handler.set_keybind_manager(_manager_with('BUTTON_2', [extra_code]))
+
+        assert device.closed
+        assert handler.device is fake_uinput.opened[-1]
+        assert len(fake_uinput.opened) == 2
+        assert extra_code in handler.device.key_codes
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_set_keybind_manager_reopens_narrowed_device(self, handler, fake_uinput):
+        """Test a device narrowed after ENOMEM is reopened with the full key set."""
+        fake_uinput.enomem_failures = 1
+        await handler.start()
+
+        await handler.set_keybind_manager(_manager_with('BUTTON_2', ['KEY_F2']))
+
+        assert len(fake_uinput.opened) == 2
+        assert set(handler.device.key_codes) >= set(KEY_MAPPING.values())
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_set_keybind_manager_without_device(self, handler, fake_uinput):
+        """Test no device is opened before start()."""
+        await handler.set_keybind_manager(_manager_with('BUTTON_2', ['KEY_F2']))
+
+        assert handler.device is None
+        assert fake_uinput.opened == []
+
+
+class TestUInputHandlerEvents:
+    """Tests for turning parsed events into uinput writes."""
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_bad_event_does_not_drop_batch(self, config, fake_uinput, monkeypatch):
+        """Test one failing event is skipped and the rest of the batch is written."""
+        handler = UInputHandler(config, _manager_with('BUTTON_2', ['KEY_F2']))
+        await handler.start()
+        real_frames = handler._action_frames
+
+        def failing_frames(action):
+            if action.keys == ['KEY_F1']:
+                raise ValueError("bad binding")
+            return real_frames(action)
+
+        monkeypatch.setattr(handler, '_action_frames', failing_frames)
+        handler.send_events([
+            InputEvent(event_type=HIDEventType.KEY_PRESS, key_code='BUTTON_1'),
+            InputEvent(event_type=HIDEventType.KEY_PRESS, key_code='BUTTON_2'),
+        ])
+
+        assert (_EV_KEY, KEY_MAPPING['KEY_F2'], 1) in handler.device.written
+        assert (_EV_KEY, KEY_MAPPING['KEY_F1'], 1) not in handler.device.written
+
+    @pytest.mark.uinput_handler
+    def test_invalid_key_codes_are_skipped(self, handler):
+        """Test out-of-range and bool key codes never reach a frame."""
+        action = KeybindAction(type=EventType.KEYBOARD, keys=['KEY_F1', 70000, -1, True])
+
+        assert handler._resolve_action_keys(action) == (KEY_MAPPING['KEY_F1'],)
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_runtime_binding_to_new_code_reopens_device(self, handler, fake_uinput):
+        """Test a raw code bound after start() gets the device reopened to advertise it."""
+        await handler.start()
+        extra_code = _unmapped_code()
+        handler.keybind_manager.set_action('BUTTON_2', KeybindAction(type=EventType.KEYBOARD, keys=[extra_code]))
+
+        handler.send_event(InputEvent(event_type=HIDEventType.KEY_PRESS, key_code='BUTTON_2'))
+        await handler._reopen_task
+
+        assert len(fake_uinput.opened) == 2
+        assert extra_code in handler.device.key_codes
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_failed_runtime_reopen_is_logged(self, handler, fake_uinput, monkeypatch, caplog):
+        """Test a background reopen that can't open the device logs an error instead of raising."""
+        await handler.start()
+        real_open = handler._try_open_device_async
+        monkeypatch.setattr(handler, '_try_open_device_async', lambda: real_open(timeout=0.05, poll_interval=0.01))
+        fake_uinput.unavailable = True
+        extra_code = _unmapped_code()
+        handler.keybind_manager.set_action('BUTTON_2', KeybindAction(type=EventType.KEYBOARD, keys=[extra_code]))
+
+        handler.send_event(InputEvent(event_type=HIDEventType.KEY_PRESS, key_code='BUTTON_2'))
+        await handler._reopen_task
+
+        assert handler.device is None
+        assert "Failed to reopen uinput device" in caplog.text
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_cancelled_reopen(self, handler, fake_uinput):
+        """Test stop() cancels a pending reopen and waits for it to finish."""
+        await handler.start()
+        fake_uinput.unavailable = True
+        extra_code = _unmapped_code()
+        handler.keybind_manager.set_action('BUTTON_2', KeybindAction(type=EventType.KEYBOARD, keys=[extra_code]))
+
+        handler.send_event(InputEvent(event_type=HIDEventType.KEY_PRESS, key_code='BUTTON_2'))
+        task = handler._reopen_task
+        await asyncio.sleep(0)  # Let the reopen start polling
+        await handler.stop()
+
+        assert task.cancelled()
+        assert handler.device is None
+
+    @pytest.mark.uinput_handler
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_records, fail_after", [
+        (1, None),  # The fd takes one record per write
+        (2, 1),     # The fd takes part of the frame, then errors
+    ])
+    async def test_short_raw_write_sends_whole_frame(self, handler, fake_uinput, monkeypatch, max_records, fail_after):
+        """Test a short raw write never drops the tail of a frame."""
+        await handler.start()
+        fd_records = []
+        calls = []
+
+        def short_write(fd, data):
+            calls.append(fd)
+            if fail_after is not None and len(calls) > fail_after:
+                raise OSError(errno.EAGAIN, "Resource temporarily unavailable")
+            taken = bytes(data[:max_records * _INPUT_EVENT.size])
+            fd_records.extend((t, c, v) for _, _, t, c, v in _INPUT_EVENT.iter_unpack(taken))
+            return len(taken)
+
+        handler._fd = 99
+        monkeypatch.setattr(uinput_handler, 'os', types.SimpleNamespace(write=short_write))
+        handler.keybind_manager.set_action('BUTTON_2', KeybindAction(type=EventType.KEYBOARD, keys=['KEY_LEFTCTRL', 'KEY_C']))
+
+        handler.send_event(InputEvent(event_type=HIDEventType.KEY_RELEASE, key_code='BUTTON_2'))
+
+        assert fd_records + handler.device.written == [
+            (_EV_KEY, KEY_MAPPING['KEY_C'], 0),
+            (_EV_KEY, KEY_MAPPING['KEY_LEFTCTRL'], 0),
+            (ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+        ]